@@ -1,6 +1,4 @@
 import logging
-import os
-from pathlib import Path
 
 from core.settings import settings
 from services.errors import send_error_message
@@ -11,6 +9,9 @@ from telegram.ext import (
 
 logger = logging.getLogger("bot")
 
+_books_in_progress: set[str] = set()
+_users_in_progress: set[int] = set()
+
 
 async def get_book(update: Update, context: ContextTypes.DEFAULT_TYPE, book_name: str):
     user_id = update.effective_user.id
@@ -23,18 +24,46 @@ async def get_book(update: Update, context: ContextTypes.DEFAULT_TYPE, book_name
         logger.error(error)
         await send_error_message(update, error)
 
+    # Обновления обрабатываются параллельно, поэтому не даём одновременно выдавать
+    # одну книгу двум читателям или две книги одному читателю
+    if book_name in _books_in_progress or user_id in _users_in_progress:
+        await send_error_message(update, "Книга уже выдаётся, подождите немного.")
+        return
+
+    _books_in_progress.add(book_name)
+    _users_in_progress.add(user_id)
+    try:
+        await _issue_book(update, user_id, book_name)
+    finally:
+        _books_in_progress.discard(book_name)
+        _users_in_progress.discard(user_id)
+
+
+async def _issue_book(update: Update, user_id: int, book_name: str):
+    query = update.callback_query
     if settings.PUNISHMENT_SYSTEM_SERVICE.get_user_info(user_id):
         await send_error_message(update, "Сначала верните текущую книгу, которую взяли.")
         return
 
-    filepath = Path(settings.BOOKS_DIR, book_name)
-    if not filepath.exists():
+    filepath = settings.CATALOG_SERVICE.get_path(book_name)
+    # Книги из каталогов только для чтения не удаляются при выдаче, поэтому проверяем и выдачи
+    if filepath is None or settings.PUNISHMENT_SYSTEM_SERVICE.is_borrowed(book_name):
         await send_error_message(update, "Такой книги нет или она недоступна.")
         return
 
+    if not settings.RESERVATION_SERVICE.is_available_for(user_id, book_name):
+        await send_error_message(update, "Книга забронирована для другого читателя, встаньте в очередь.")
+        return
+
+    # Выбираем самый лёгкий вариант файла, который пройдёт по лимиту загрузки
+    delivery_path = settings.BOOK_VARIANT_SERVICE.get_delivery_path(filepath)
+    if delivery_path is None:
+        await send_error_message(update, "Файл книги слишком большой для отправки, попробуйте позже.")
+        return
+
     # Отправляем файл книги и фиксируем выдачу
     try:
-        with open(filepath, "rb") as file:
+        with open(delivery_path, "rb") as file:
             await query.message.reply_document(document=file, filename=book_name)
     except Exception as e:
         error = f"Ошибка при отправке книги: {e}"
@@ -42,10 +71,12 @@ async def get_book(update: Update, context: ContextTypes.DEFAULT_TYPE, book_name
         await send_error_message(update, error)
         return
 
-    # Удаляем файл из каталога и отмечаем книгу как выданную
+    # Отмечаем книгу как выданную. Файл убираем из каталога, только если отправили сам оригинал:
+    # после сжатого варианта оригинал остаётся на диске, чтобы при возврате его не заменила сжатая копия
     try:
-        os.remove(filepath)
-        settings.PUNISHMENT_SYSTEM_SERVICE.add_borrow(user_id, book_name)
+        removed_from = settings.CATALOG_SERVICE.remove(book_name) if delivery_path == filepath else None
+        settings.PUNISHMENT_SYSTEM_SERVICE.add_borrow(user_id, book_name, removed_from)
+        settings.RESERVATION_SERVICE.claim(user_id, book_name)
     except Exception as e:
         error = f"Ошибка при обновлении статуса книги: {e}"
         logger.error(error)
@@ -57,6 +88,19 @@ async def get_book(update: Update, context: ContextTypes.DEFAULT_TYPE, book_name
 
 async def return_book(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
+    # Повторно отправленный файл не должен второй раз закрыть выдачу и передать бронь
+    if user_id in _users_in_progress:
+        await send_error_message(update, "Возврат уже обрабатывается, подождите немного.")
+        return
+
+    _users_in_progress.add(user_id)
+    try:
+        await _accept_return(update, user_id)
+    finally:
+        _users_in_progress.discard(user_id)
+
+
+async def _accept_return(update: Update, user_id: int):
     user_info = settings.PUNISHMENT_SYSTEM_SERVICE.get_user_info(user_id)
     if not user_info:
         await send_error_message(update, "У вас нет взятых книг для возврата.")
@@ -73,17 +117,24 @@ async def return_book(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await send_error_message(update, "Пожалуйста, верните ту же книгу, которую вы взяли!")
         return
 
-    file_path = Path(settings.BOOKS_DIR, book_name)
-
-    try:
-        pdf_file = await document.get_file()
-        await pdf_file.download_to_drive(file_path)
-    except Exception as e:
-        error = f"Ошибка при сохранении файла: {e}"
-        logger.error(error)
-        await send_error_message(update, error)
-        return
-
-    settings.PUNISHMENT_SYSTEM_SERVICE.return_book(user_id)
+    # None — оригинал книги остался в каталоге (каталог только для чтения или был отправлен вариант)
+    removed_from = user_info.get("removed_from")
+    file_path = settings.CATALOG_SERVICE.get_return_path(book_name, removed_from)
+
+    if file_path is not None:
+        try:
+            pdf_file = await document.get_file()
+            await pdf_file.download_to_drive(file_path)
+        except Exception as e:
+            error = f"Ошибка при сохранении файла: {e}"
+            logger.error(error)
+            await send_error_message(update, error)
+            return
+        settings.CATALOG_SERVICE.add_returned(book_name, removed_from)
+        settings.BOOK_VARIANT_SERVICE.schedule_build(file_path)
+
+    if settings.PUNISHMENT_SYSTEM_SERVICE.return_book(user_id):
+        # Книга вернулась — удерживаем её для первого в очереди
+        await settings.RESERVATION_SERVICE.release(book_name)
 
     await update.message.reply_text(f"Спасибо, книга '{book_name}' успешно возвращена в библиотеку!")
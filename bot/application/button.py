@@ -8,6 +8,9 @@ from telegram.ext import (
 from application.book import get_book
 from application.dept import get_my_debt
 from application.list import list_books
+from application.peek import peek_book
+from application.popular import popular_books
+from application.reservation import reserve_book
 
 
 async def handle_buttons(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -20,9 +23,17 @@ async def handle_buttons(update: Update, context: ContextTypes.DEFAULT_TYPE):
     elif data.startswith("get_book:"):
         book_name = data.split("get_book:", 1)[1]
         await get_book(update, context, book_name)
+    elif data.startswith("peek:"):
+        page, book_name = data.split(":", 2)[1:]
+        await peek_book(update, context, book_name, int(page))
+    elif data.startswith("reserve:"):
+        book_name = data.split("reserve:", 1)[1]
+        await reserve_book(update, context, book_name)
     elif data == "help":
         await query.edit_message_text(help_text)
     elif data == "get_my_debt":
         await get_my_debt(update, context)
+    elif data == "popular_books":
+        await popular_books(update, context)
     else:
         await send_error_message(update, "Неизвестная команда.")
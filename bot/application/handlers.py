@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from services.update_recorder import UpdateRecorder
+from telegram import Update
+from telegram.ext import (
+    Application,
+    CallbackQueryHandler,
+    CommandHandler,
+    MessageHandler,
+    TypeHandler,
+    filters,
+)
+
+from application.book import return_book
+from application.button import handle_buttons
+from application.report import overdue_report
+from application.starter import start
+
+
+def register_handlers(app: Application, record_updates_file: Path | None = None):
+    if record_updates_file:
+        # Группа -1 выполняется раньше основных обработчиков и не мешает им
+        recorder = UpdateRecorder(record_updates_file)
+        app.add_handler(TypeHandler(Update, recorder.record), group=-1)
+
+    app.add_handler(CommandHandler("start", start))
+    app.add_handler(CommandHandler("overdue_report", overdue_report))
+    app.add_handler(CallbackQueryHandler(handle_buttons))
+    app.add_handler(MessageHandler(filters.Document.FileExtension("pdf"), return_book))
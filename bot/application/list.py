@@ -1,9 +1,10 @@
+import asyncio
 import logging
-import os
 
 from core.settings import settings
 from services.book_preview import get_pdf_preview_in_memory
 from services.errors import send_error_message
+from services.pdf_metadata import PdfMetadata
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import (
     ContextTypes,
@@ -14,20 +15,49 @@ logger = logging.getLogger("bot")
 
 async def list_books(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
-        files = os.listdir(settings.BOOKS_DIR)
-        books = [f for f in files if f.lower().endswith(".pdf")]
+        user_id = update.effective_user.id
+        catalog = await asyncio.to_thread(settings.CATALOG_SERVICE.scan)
+        unavailable_books = get_unavailable_books(user_id)
+        # Своя книга не предлагается ни к выдаче, ни в очередь: если читателю отправили сжатый вариант,
+        # оригинал остаётся в каталоге
+        own_book = get_own_book(user_id)
+        books = [f for f in catalog if f not in unavailable_books and f != own_book]
 
-        if not books:
+        if not books and not unavailable_books:
             await send_error_message(update, "В библиотеке нет доступных книг.")
             return
 
+        # Метаданные читаются из самих PDF без poppler, поэтому их можно брать для всего каталога
+        metadata = await asyncio.to_thread(get_books_metadata, books)
+        books.sort(key=lambda book: get_book_title(book, metadata[book]).lower())
+
         for book in books:
+            # Poppler рендерит превью синхронно — в отдельном потоке, чтобы не останавливать цикл событий
+            preview = await asyncio.to_thread(get_pdf_preview_in_memory, book)
             await context.bot.send_photo(
                 chat_id=update.effective_chat.id,
-                photo=get_pdf_preview_in_memory(book),
-                caption=f"Забрать книгу: {book}",
+                photo=preview,
+                caption=get_book_caption(book, metadata[book]),
+                reply_markup=InlineKeyboardMarkup(
+                    [
+                        [
+                            InlineKeyboardButton("Забрать", callback_data=f"get_book:{book}"),
+                            InlineKeyboardButton("Полистать", callback_data=f"peek:1:{book}"),
+                        ]
+                    ]
+                ),
+            )
+
+        if unavailable_books:
+            # Выданные книги показываем одним текстовым сообщением без превью
+            await context.bot.send_message(
+                chat_id=update.effective_chat.id,
+                text="Сейчас на руках — можно встать в очередь:",
                 reply_markup=InlineKeyboardMarkup(
-                    [[InlineKeyboardButton("Забрать", callback_data=f"get_book:{book}")]]
+                    [
+                        [InlineKeyboardButton(f"В очередь: {book}", callback_data=f"reserve:{book}")]
+                        for book in unavailable_books
+                    ]
                 ),
             )
 
@@ -40,3 +70,38 @@ async def list_books(update: Update, context: ContextTypes.DEFAULT_TYPE):
         error = f"Ошибка при чтении каталога книг: {e}"
         logger.error(error)
         await send_error_message(update, error)
+
+
+def get_unavailable_books(user_id: int) -> list[str]:
+    """
+    Книги, которые сейчас у других читателей или удерживаются для следующего в очереди.
+    """
+    own_book = get_own_book(user_id)
+    borrowed = {record["book"] for record in settings.PUNISHMENT_SYSTEM_SERVICE.borrowed_books.values()}
+    reservations = settings.RESERVATION_SERVICE
+    held = {book for book in reservations.holds if not reservations.is_available_for(user_id, book)}
+    return sorted((borrowed | held) - {own_book})
+
+
+def get_own_book(user_id: int) -> str | None:
+    user_info = settings.PUNISHMENT_SYSTEM_SERVICE.get_user_info(user_id)
+    return user_info["book"] if user_info else None
+
+
+def get_books_metadata(books: list[str]) -> dict[str, PdfMetadata | None]:
+    return {book: settings.CATALOG_SERVICE.get_metadata(book) for book in books}
+
+
+def get_book_title(book: str, metadata: PdfMetadata | None) -> str:
+    return metadata.title if metadata and metadata.title else book
+
+
+def get_book_caption(book: str, metadata: PdfMetadata | None) -> str:
+    caption = f"Забрать книгу: {book}"
+    if metadata is None:
+        return caption
+    if metadata.title:
+        caption += f"\nНазвание: {metadata.title}"
+    if metadata.author:
+        caption += f"\nАвтор: {metadata.author}"
+    return caption + f"\nСтраниц: {metadata.page_count}"
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+
+from core.settings import settings
+from services.book_preview import get_page_count, render_page
+from services.errors import send_error_message
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto, Update
+from telegram.ext import (
+    ContextTypes,
+)
+
+logger = logging.getLogger("bot")
+
+
+# Переходы к другим фрагментам книги: на один и на десять фрагментов назад и вперёд
+JUMP_WINDOWS = (-10, -1, 1, 10)
+
+
+def get_peek_window(page: int, page_count: int, max_pages: int) -> tuple[int, int]:
+    """
+    Фрагмент книги из не более чем max_pages страниц, в который попадает страница.
+    """
+    first = (page - 1) // max_pages * max_pages + 1
+    return first, min(first + max_pages - 1, page_count)
+
+
+def get_jump_pages(first_page: int, page_count: int, max_pages: int) -> list[int]:
+    """
+    Первые страницы соседних фрагментов для перехода к нужной главе.
+    """
+    pages = set()
+    for windows in JUMP_WINDOWS:
+        target = max(1, min(first_page + windows * max_pages, page_count))
+        target = get_peek_window(target, page_count, max_pages)[0]
+        if target != first_page:
+            pages.add(target)
+    return sorted(pages)
+
+
+async def peek_book(update: Update, context: ContextTypes.DEFAULT_TYPE, book_name: str, page: int):
+    query = update.callback_query
+    try:
+        page_count = await asyncio.to_thread(get_page_count, book_name)
+        page = max(1, min(page, page_count))
+        image = await asyncio.to_thread(render_page, book_name, page) if page_count else None
+    except Exception as e:
+        error = f"Ошибка при отрисовке страницы: {e}"
+        logger.error(error)
+        await send_error_message(update, error)
+        return
+
+    if image is None:
+        await send_error_message(update, "Книга сейчас недоступна для просмотра.")
+        return
+
+    # Ограничение действует на размер фрагмента, а не на его положение: листать можно любую главу
+    first_page, last_page = get_peek_window(page, page_count, settings.PEEK_MAX_PAGES)
+    caption = f"{book_name}\nСтраница {page} из {page_count} (фрагмент {first_page}–{last_page})"
+
+    navigation = []
+    if page > first_page:
+        navigation.append(InlineKeyboardButton("◀", callback_data=f"peek:{page - 1}:{book_name}"))
+    if page < last_page:
+        navigation.append(InlineKeyboardButton("▶", callback_data=f"peek:{page + 1}:{book_name}"))
+    jumps = [
+        InlineKeyboardButton(
+            f"« {target}" if target < first_page else f"{target} »", callback_data=f"peek:{target}:{book_name}"
+        )
+        for target in get_jump_pages(first_page, page_count, settings.PEEK_MAX_PAGES)
+    ]
+    keyboard = [row for row in (navigation, jumps) if row]
+    keyboard.append([InlineKeyboardButton("Забрать", callback_data=f"get_book:{book_name}")])
+
+    # Листаем в том же сообщении, не отправляя новых
+    await query.edit_message_media(
+        media=InputMediaPhoto(media=image, caption=caption),
+        reply_markup=InlineKeyboardMarkup(keyboard),
+    )
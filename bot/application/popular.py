@@ -0,0 +1,22 @@
+from core.settings import settings
+from services.errors import send_error_message
+from telegram import Update
+from telegram.ext import (
+    ContextTypes,
+)
+
+
+async def popular_books(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    history = settings.BORROW_HISTORY_SERVICE
+    books = history.popular_books()
+    if not books:
+        await send_error_message(update, "Пока никто не брал книги.")
+        return
+
+    lines = [f"{position}. {book} — {count} раз" for position, (book, count) in enumerate(books, start=1)]
+    popular_message = (
+        "Популярные книги:\n\n"
+        + "\n".join(lines)
+        + f"\n\nСредний срок чтения: {history.average_loan_days():.1f} дн."
+    )
+    await update.callback_query.edit_message_text(popular_message)
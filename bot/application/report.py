@@ -0,0 +1,35 @@
+import io
+import logging
+from datetime import datetime
+
+from core.settings import settings
+from services.errors import send_error_message
+from services.overdue_report import render_csv, total_fine
+from telegram import Update
+from telegram.ext import (
+    ContextTypes,
+)
+
+logger = logging.getLogger("bot")
+
+
+async def overdue_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.effective_user.id not in settings.ADMIN_IDS:
+        await send_error_message(update, "Команда доступна только администраторам.")
+        return
+
+    try:
+        report = settings.PUNISHMENT_SYSTEM_SERVICE.build_overdue_report()
+        document = io.BytesIO(render_csv(report).encode("utf-8"))
+        await update.message.reply_document(
+            document=document,
+            filename=f"overdue_{datetime.utcnow().date()}.csv",
+            caption=(
+                f"Просроченных выдач: {len(report['user_id'])}\n"
+                f"Сумма штрафов: {total_fine(report)} у.е."
+            ),
+        )
+    except Exception as e:
+        error = f"Ошибка при формировании отчёта: {e}"
+        logger.error(error)
+        await send_error_message(update, error)
@@ -0,0 +1,33 @@
+from core.settings import settings
+from services.errors import send_error_message
+from telegram import Update
+from telegram.ext import (
+    ContextTypes,
+)
+
+
+async def reserve_book(update: Update, context: ContextTypes.DEFAULT_TYPE, book_name: str):
+    user_id = update.effective_user.id
+    query = update.callback_query
+
+    user_info = settings.PUNISHMENT_SYSTEM_SERVICE.get_user_info(user_id)
+    if user_info and user_info["book"] == book_name:
+        await send_error_message(update, "Эта книга уже у вас.")
+        return
+
+    if (
+        settings.CATALOG_SERVICE.get_path(book_name) is not None
+        and not settings.PUNISHMENT_SYSTEM_SERVICE.is_borrowed(book_name)
+        and settings.RESERVATION_SERVICE.is_available_for(user_id, book_name)
+    ):
+        await send_error_message(update, "Книга уже в библиотеке, заберите её из списка книг.")
+        return
+
+    position = settings.RESERVATION_SERVICE.reserve(user_id, book_name)
+    if position is None:
+        await send_error_message(update, "Вы уже в очереди на эту книгу.")
+        return
+
+    await query.message.reply_text(
+        f"Вы в очереди на книгу '{book_name}', ваш номер: {position}. Мы сообщим, когда книга вернётся."
+    )
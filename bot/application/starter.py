@@ -5,6 +5,7 @@ from telegram.ext import ContextTypes
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard = [
         [InlineKeyboardButton("Список книг", callback_data="list_books")],
+        [InlineKeyboardButton("Популярные книги", callback_data="popular_books")],
         [InlineKeyboardButton("Мой долг", callback_data="get_my_debt")],
         [InlineKeyboardButton("Помощь", callback_data="help")],
     ]
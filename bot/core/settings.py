@@ -3,10 +3,17 @@ from functools import cached_property
 from pathlib import Path
 from typing import Any
 
+from domain.book_root import BookRoot
+from infrastructure.http_transport import MeasuredRequest, RoutingRequest
 from infrastructure.settings_source import ConfigSettingsSource
-from pydantic import computed_field, field_validator
+from infrastructure.update_processor import PriorityUpdateProcessor
+from pydantic import computed_field, field_validator, model_validator
 from pydantic_settings import BaseSettings, PydanticBaseSettingsSource
+from services.book_variants import BookVariantService
+from services.borrow_history import BorrowHistoryService
+from services.catalog import CatalogService
 from services.punishment_system import PunishmentSystemService
+from services.reservation import ReservationService
 from telegram.ext import Application, ApplicationBuilder
 
 
@@ -16,9 +23,38 @@ class Settings(BaseSettings):
     LOG_FILE: Path = Path(BASE_PATH.parent / "bot.log")
     DEFAULT_PREVIEW_IMAGE: Path = Path(BASE_PATH / "resources/book_preview.png")
     BORROWED_DATA_FILE: Path = Path(BASE_PATH / "infrastructure/jsondb/borrowed_data.json")
+    BORROW_EVENTS_FILE: Path = Path(BASE_PATH / "infrastructure/jsondb/borrow_events.jsonl")
+    BORROW_STATS_FILE: Path = Path(BASE_PATH / "infrastructure/jsondb/borrow_stats.json")
+    RESERVATIONS_FILE: Path = Path(BASE_PATH / "infrastructure/jsondb/reservations.json")
+    BOOK_VARIANTS_DIR: Path = Path(BASE_PATH / "infrastructure/variants")
 
-    BOOKS_DIR: Path
+    BOOKS_DIR: Path | None = None
+    BOOK_ROOTS: list[BookRoot] = []
+    RETURN_ROOT: str | None = None
     BOT_TOKEN: str
+    ADMIN_IDS: list[int] = []
+    BOOK_VARIANTS_ENABLED: bool = False
+    UPLOAD_LIMIT_MB: int = 50
+    RECORD_UPDATES_FILE: Path | None = None
+    RESERVATION_HOLD_HOURS: int = 24
+
+    HTTP_VERSION: str = "1.1"
+    HTTP_POOL_SIZE: int = 16
+    HTTP_MEDIA_POOL_SIZE: int = 4
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 5.0
+    HTTP_WRITE_TIMEOUT: float = 5.0
+    HTTP_MEDIA_WRITE_TIMEOUT: float = 60.0
+    HTTP_POOL_TIMEOUT: float = 1.0
+    HTTP_POOL_WAIT_WARNING: float = 0.5
+
+    PEEK_MAX_PAGES: int = 10
+    PEEK_CACHE_MB: int = 64
+
+    INTERACTIVE_WORKERS: int = 8
+    HEAVY_WORKERS: int = 2
+    LANE_WAIT_WARNING: float = 1.0
+    LANE_STATS_INTERVAL: float = 300
 
     @classmethod
     def settings_customise_sources(
@@ -41,12 +77,59 @@ class Settings(BaseSettings):
     @computed_field
     @cached_property
     def APP(self) -> Application:  # noqa: N802
-        return ApplicationBuilder().token(self.BOT_TOKEN).build()
+        return (
+            ApplicationBuilder()
+            .token(self.BOT_TOKEN)
+            .request(
+                RoutingRequest(
+                    default=self._build_request("default", self.HTTP_POOL_SIZE, self.HTTP_WRITE_TIMEOUT),
+                    media=self._build_request("media", self.HTTP_MEDIA_POOL_SIZE, self.HTTP_MEDIA_WRITE_TIMEOUT),
+                )
+            )
+            # getUpdates держит одно долгое соединение и не должен делить пул с остальными запросами
+            .get_updates_request(self._build_request("get_updates", 1, self.HTTP_WRITE_TIMEOUT))
+            .concurrent_updates(
+                PriorityUpdateProcessor(
+                    self.INTERACTIVE_WORKERS,
+                    self.HEAVY_WORKERS,
+                    wait_warning=self.LANE_WAIT_WARNING,
+                    stats_interval_seconds=self.LANE_STATS_INTERVAL,
+                )
+            )
+            .build()
+        )
 
     @computed_field
     @cached_property
     def PUNISHMENT_SYSTEM_SERVICE(self) -> PunishmentSystemService:  # noqa: N802
-        return PunishmentSystemService(self.APP.bot, self.BORROWED_DATA_FILE)
+        return PunishmentSystemService(self.APP.bot, self.BORROWED_DATA_FILE, history=self.BORROW_HISTORY_SERVICE)
+
+    @computed_field
+    @cached_property
+    def RESERVATION_SERVICE(self) -> ReservationService:  # noqa: N802
+        return ReservationService(
+            self.APP.bot,
+            self.RESERVATIONS_FILE,
+            hold_hours=self.RESERVATION_HOLD_HOURS,
+            loans=self.PUNISHMENT_SYSTEM_SERVICE,
+        )
+
+    @computed_field
+    @cached_property
+    def BORROW_HISTORY_SERVICE(self) -> BorrowHistoryService:  # noqa: N802
+        return BorrowHistoryService(self.BORROW_EVENTS_FILE, self.BORROW_STATS_FILE)
+
+    @computed_field
+    @cached_property
+    def CATALOG_SERVICE(self) -> CatalogService:  # noqa: N802
+        return CatalogService(self.BOOK_ROOTS, self.RETURN_ROOT)
+
+    @computed_field
+    @cached_property
+    def BOOK_VARIANT_SERVICE(self) -> BookVariantService:  # noqa: N802
+        return BookVariantService(
+            self.BOOK_VARIANTS_DIR, self.UPLOAD_LIMIT_MB * 1024 * 1024, enabled=self.BOOK_VARIANTS_ENABLED
+        )
 
     @computed_field
     @cached_property
@@ -83,13 +166,42 @@ class Settings(BaseSettings):
             "datefmt": "%Y-%m-%d %H:%M:%S",
         }
 
+    def _build_request(self, name: str, pool_size: int, write_timeout: float) -> MeasuredRequest:
+        return MeasuredRequest(
+            name,
+            connection_pool_size=pool_size,
+            pool_timeout=self.HTTP_POOL_TIMEOUT,
+            pool_wait_warning=self.HTTP_POOL_WAIT_WARNING,
+            connect_timeout=self.HTTP_CONNECT_TIMEOUT,
+            read_timeout=self.HTTP_READ_TIMEOUT,
+            write_timeout=write_timeout,
+            # Для запросов с файлами HTTPXRequest берёт media_write_timeout, а не write_timeout
+            media_write_timeout=self.HTTP_MEDIA_WRITE_TIMEOUT,
+            http_version=self.HTTP_VERSION,
+        )
+
     @field_validator("CONFIG_FILE", "LOG_FILE", "DEFAULT_PREVIEW_IMAGE", "BORROWED_DATA_FILE", "BOOKS_DIR")
     @classmethod
-    def validate_path_exist(cls, value: Path) -> Path:
-        if not value.exists():
+    def validate_path_exist(cls, value: Path | None) -> Path | None:
+        if value is not None and not value.exists():
             raise ValueError(f"Path does not exist: {value}")
         return value
 
+    @model_validator(mode="after")
+    def validate_book_roots(self) -> "Settings":
+        # Без секции BOOK_ROOTS единственный каталог книг — BOOKS_DIR
+        if not self.BOOK_ROOTS:
+            if self.BOOKS_DIR is None:
+                raise ValueError("Either BOOKS_DIR or BOOK_ROOTS must be configured")
+            self.BOOK_ROOTS = [BookRoot(name="main", path=self.BOOKS_DIR)]
+
+        writable_roots = [root.name for root in self.BOOK_ROOTS if root.writable]
+        if self.RETURN_ROOT is None and writable_roots:
+            self.RETURN_ROOT = writable_roots[0]
+        if self.RETURN_ROOT not in writable_roots:
+            raise ValueError(f"RETURN_ROOT must be one of the writable book roots: {writable_roots}")
+        return self
+
 
 settings = Settings()  # type: ignore
 logging.config.dictConfig(settings.LOGGER_CONFIG)
@@ -0,0 +1,22 @@
+from pathlib import Path
+
+from pydantic import BaseModel, field_validator
+
+
+class BookRoot(BaseModel):
+    """
+    Каталог с книгами. Если книга с одним именем лежит в нескольких каталогах,
+    выдаётся копия из каталога с большим весом (например, с более быстрого диска).
+    """
+
+    name: str
+    path: Path
+    weight: float = 1.0
+    writable: bool = True
+
+    @field_validator("path")
+    @classmethod
+    def validate_path_exist(cls, value: Path) -> Path:
+        if not value.exists():
+            raise ValueError(f"Path does not exist: {value}")
+        return value
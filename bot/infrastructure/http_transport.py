@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+
+from telegram.error import TimedOut
+from telegram.request import BaseRequest, HTTPXRequest, RequestData
+
+logger = logging.getLogger("bot")
+
+# Методы Bot API, которые загружают файлы и идут через отдельный пул соединений
+MEDIA_ENDPOINTS = {
+    "sendDocument",
+    "sendPhoto",
+    "sendMediaGroup",
+    "sendAudio",
+    "sendVideo",
+    "editMessageMedia",
+}
+
+
+class MeasuredRequest(HTTPXRequest):
+    """
+    HTTPXRequest, который замеряет и логирует ожидание свободного соединения в пуле.
+    Соединения выдаются через собственный семафор размером с пул, поэтому время
+    ожидания на нём и есть время ожидания пула httpx.
+    """
+
+    def __init__(self, name: str, connection_pool_size: int, pool_timeout: float, pool_wait_warning: float, **kwargs):
+        """
+        :param name: имя пула для логов.
+        :param connection_pool_size: количество соединений в пуле.
+        :param pool_timeout: сколько ждать свободное соединение, прежде чем вернуть TimedOut.
+        :param pool_wait_warning: порог ожидания в секундах, после которого пишется предупреждение.
+        """
+        super().__init__(connection_pool_size=connection_pool_size, pool_timeout=pool_timeout, **kwargs)
+        self.name = name
+        self.pool_timeout = pool_timeout
+        self.pool_wait_warning = pool_wait_warning
+        self._slots = asyncio.Semaphore(connection_pool_size)
+
+        self.requests = 0
+        self.total_pool_wait = 0.0
+        self.max_pool_wait = 0.0
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: RequestData | None = None,
+        *args,
+        **kwargs,
+    ) -> tuple[int, bytes]:
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.pool_timeout)
+        except TimeoutError as e:
+            logger.warning(f"Пул '{self.name}' исчерпан: нет свободного соединения за {self.pool_timeout} с")
+            raise TimedOut("Pool timeout: все соединения пула заняты") from e
+
+        waited = time.monotonic() - started
+        self._record_wait(url, waited)
+        try:
+            return await super().do_request(url, method, request_data, *args, **kwargs)
+        finally:
+            self._slots.release()
+
+    def _record_wait(self, url: str, waited: float):
+        self.requests += 1
+        self.total_pool_wait += waited
+        self.max_pool_wait = max(self.max_pool_wait, waited)
+        endpoint = url.rsplit("/", 1)[-1]
+        if waited >= self.pool_wait_warning:
+            logger.warning(f"Ожидание соединения в пуле '{self.name}' для {endpoint}: {waited:.3f} с")
+        else:
+            logger.debug(f"Ожидание соединения в пуле '{self.name}' для {endpoint}: {waited:.3f} с")
+
+
+class RoutingRequest(BaseRequest):
+    """
+    Транспорт, который отправляет загрузку файлов через отдельный пул,
+    чтобы большие документы не занимали соединения для лёгких запросов.
+    """
+
+    def __init__(self, default: BaseRequest, media: BaseRequest):
+        self.default = default
+        self.media = media
+
+    @property
+    def read_timeout(self) -> float | None:
+        return self.default.read_timeout
+
+    async def initialize(self):
+        await self.default.initialize()
+        await self.media.initialize()
+
+    async def shutdown(self):
+        await self.default.shutdown()
+        await self.media.shutdown()
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: RequestData | None = None,
+        *args,
+        **kwargs,
+    ) -> tuple[int, bytes]:
+        # Скачивание файлов (File.download_to_drive) тоже тяжёлое
+        is_media = "/file/bot" in url or url.rsplit("/", 1)[-1] in MEDIA_ENDPOINTS
+        request = self.media if is_media else self.default
+        return await request.do_request(url, method, request_data, *args, **kwargs)
@@ -29,12 +29,53 @@ class ConfigSettingsSource(PydanticBaseSettingsSource):
         project_dir = Path(__file__).resolve().parent.parent.parent
         config.read(f"{project_dir}/bot.conf", "utf-8")
 
+        books_dir = config.get("BASE", "BOOKS_DIR", fallback="")
+        record_file = config.get("TRAFFIC", "RECORD_FILE", fallback="")
         conf_setting = {
-            "BOOKS_DIR": Path(config.get("BASE", "BOOKS_DIR", fallback="")),
+            "BOOKS_DIR": Path(books_dir) if books_dir else None,
+            "BOOK_ROOTS": ConfigSettingsSource._read_book_roots(config),
+            "RETURN_ROOT": config.get("BASE", "RETURN_ROOT", fallback=None) or None,
             "BOT_TOKEN": config.get("BASE", "BOT_TOKEN", fallback=""),
+            "ADMIN_IDS": [
+                int(admin_id)
+                for admin_id in config.get("BASE", "ADMIN_IDS", fallback="").split(",")
+                if admin_id.strip()
+            ],
+            "BOOK_VARIANTS_ENABLED": config.getboolean("VARIANTS", "ENABLED", fallback=None),
+            "UPLOAD_LIMIT_MB": config.getint("VARIANTS", "UPLOAD_LIMIT_MB", fallback=None),
+            "RECORD_UPDATES_FILE": Path(record_file) if record_file else None,
+            "RESERVATION_HOLD_HOURS": config.getint("RESERVATION", "HOLD_HOURS", fallback=None),
+            "HTTP_VERSION": config.get("HTTP", "HTTP_VERSION", fallback=None),
+            "HTTP_POOL_SIZE": config.getint("HTTP", "POOL_SIZE", fallback=None),
+            "HTTP_MEDIA_POOL_SIZE": config.getint("HTTP", "MEDIA_POOL_SIZE", fallback=None),
+            "HTTP_CONNECT_TIMEOUT": config.getfloat("HTTP", "CONNECT_TIMEOUT", fallback=None),
+            "HTTP_READ_TIMEOUT": config.getfloat("HTTP", "READ_TIMEOUT", fallback=None),
+            "HTTP_WRITE_TIMEOUT": config.getfloat("HTTP", "WRITE_TIMEOUT", fallback=None),
+            "HTTP_MEDIA_WRITE_TIMEOUT": config.getfloat("HTTP", "MEDIA_WRITE_TIMEOUT", fallback=None),
+            "HTTP_POOL_TIMEOUT": config.getfloat("HTTP", "POOL_TIMEOUT", fallback=None),
+            "HTTP_POOL_WAIT_WARNING": config.getfloat("HTTP", "POOL_WAIT_WARNING", fallback=None),
+            "PEEK_MAX_PAGES": config.getint("PEEK", "MAX_PAGES", fallback=None),
+            "PEEK_CACHE_MB": config.getint("PEEK", "CACHE_MB", fallback=None),
+            "INTERACTIVE_WORKERS": config.getint("LANES", "INTERACTIVE_WORKERS", fallback=None),
+            "HEAVY_WORKERS": config.getint("LANES", "HEAVY_WORKERS", fallback=None),
+            "LANE_WAIT_WARNING": config.getfloat("LANES", "WAIT_WARNING", fallback=None),
+            "LANE_STATS_INTERVAL": config.getfloat("LANES", "STATS_INTERVAL", fallback=None),
         }
         return conf_setting
 
+    @staticmethod
+    def _read_book_roots(config: configparser.ConfigParser) -> list[dict[str, Any]] | None:
+        """
+        Строки секции BOOK_ROOTS: имя = путь, вес, rw|ro
+        """
+        if not config.has_section("BOOK_ROOTS"):
+            return None
+        roots = []
+        for name, value in config.items("BOOK_ROOTS"):
+            path, weight, mode = (part.strip() for part in value.rsplit(",", 2))
+            roots.append({"name": name, "path": Path(path), "weight": float(weight), "writable": mode == "rw"})
+        return roots
+
     def get_field_value(
         self,
         field: FieldInfo,
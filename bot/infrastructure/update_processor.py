@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable
+from typing import Any
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger("bot")
+
+INTERACTIVE_LANE = "interactive"
+HEAVY_LANE = "heavy"
+
+# Действия с рендерингом превью и отправкой файлов; всё остальное — лёгкие интерактивные действия
+HEAVY_ACTIONS = {"list_books", "get_book", "peek"}
+
+
+def get_update_action(update: object) -> str:
+    """
+    Короткое имя действия пользователя: команда, callback без аргументов или тип сообщения.
+    """
+    if not isinstance(update, Update):
+        return "other"
+    if update.callback_query and update.callback_query.data:
+        return update.callback_query.data.split(":", 1)[0]
+    message = update.message
+    if message and message.text and message.text.startswith("/"):
+        return message.text.split()[0].split("@", 1)[0]
+    if message and message.document:
+        return "document"
+    return "other"
+
+
+class LaneStats:
+    def __init__(self):
+        self.waiting = 0
+        self.processed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def reset(self):
+        self.processed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+
+class PriorityUpdateProcessor(BaseUpdateProcessor):
+    """
+    Обработчик обновлений с отдельными полосами: лёгкие действия (долг, помощь, старт, возврат)
+    не ждут, пока обрабатываются тяжёлые (список книг с превью, выдача PDF).
+    """
+
+    def __init__(
+        self,
+        interactive_workers: int,
+        heavy_workers: int,
+        max_queued_updates: int = 256,
+        wait_warning: float = 1.0,
+        stats_interval_seconds: float = 300,
+    ):
+        """
+        :param interactive_workers: сколько лёгких обновлений обрабатывается одновременно.
+        :param heavy_workers: сколько тяжёлых обновлений обрабатывается одновременно.
+        :param max_queued_updates: сколько обновлений может ждать своей полосы.
+        :param wait_warning: порог ожидания в очереди в секундах, после которого пишется предупреждение.
+        :param stats_interval_seconds: как часто писать в лог статистику по полосам.
+        """
+        # Общий лимит базового класса включает и ожидающие обновления: если бы он был равен
+        # сумме полос, тяжёлые обновления в ожидании занимали бы места лёгких
+        super().__init__(max_concurrent_updates=interactive_workers + heavy_workers + max_queued_updates)
+        self.wait_warning = wait_warning
+        self.stats_interval_seconds = stats_interval_seconds
+        self._lanes = {
+            INTERACTIVE_LANE: asyncio.Semaphore(interactive_workers),
+            HEAVY_LANE: asyncio.Semaphore(heavy_workers),
+        }
+        self.stats = {lane: LaneStats() for lane in self._lanes}
+        self._stats_task = None
+
+    @staticmethod
+    def get_lane(update: object) -> str:
+        return HEAVY_LANE if get_update_action(update) in HEAVY_ACTIONS else INTERACTIVE_LANE
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]):
+        lane = self.get_lane(update)
+        stats = self.stats[lane]
+        stats.waiting += 1
+        queued_at = time.monotonic()
+        async with self._lanes[lane]:
+            stats.waiting -= 1
+            self._record_wait(lane, get_update_action(update), time.monotonic() - queued_at)
+            await coroutine
+
+    def _record_wait(self, lane: str, action: str, waited: float):
+        stats = self.stats[lane]
+        stats.processed += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+        if waited >= self.wait_warning:
+            logger.warning(f"Полоса '{lane}': {action} ждал обработки {waited:.3f} с, в очереди {stats.waiting}")
+
+    async def initialize(self):
+        self._stats_task = asyncio.create_task(self._log_stats_loop())
+
+    async def shutdown(self):
+        if self._stats_task:
+            self._stats_task.cancel()
+            self._stats_task = None
+
+    async def _log_stats_loop(self):
+        while True:
+            await asyncio.sleep(self.stats_interval_seconds)
+            for lane, stats in self.stats.items():
+                if not stats.processed:
+                    continue
+                logger.info(
+                    f"Полоса '{lane}': обработано {stats.processed}, "
+                    f"ожидание среднее {stats.total_wait / stats.processed * 1000:.1f} мс, "
+                    f"макс {stats.max_wait * 1000:.1f} мс, в очереди {stats.waiting}"
+                )
+                stats.reset()
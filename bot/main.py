@@ -4,17 +4,9 @@ import os
 import sys
 from pathlib import Path
 
-from application.book import return_book
-from application.button import handle_buttons
-from application.starter import start
+from application.handlers import register_handlers
 from core.settings import settings
 from resources.start_bot_text import start_bot_text
-from telegram.ext import (
-    CallbackQueryHandler,
-    CommandHandler,
-    MessageHandler,
-    filters,
-)
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 
@@ -24,8 +16,10 @@ logger = logging.getLogger("bot")
 class ReloadHandler(FileSystemEventHandler):
     EXCLUDE_PATHS: list[str] = [
         settings.BORROWED_DATA_FILE.parent.relative_to(settings.BASE_PATH).as_posix(),
-        Path(settings.BOOKS_DIR).relative_to(settings.BASE_PATH.parent).as_posix(),
+        *[root.path.resolve().as_posix() for root in settings.BOOK_ROOTS],
         Path(settings.LOG_FILE).relative_to(settings.BASE_PATH.parent).as_posix(),
+        settings.BOOK_VARIANTS_DIR.relative_to(settings.BASE_PATH).as_posix(),
+        *([settings.RECORD_UPDATES_FILE.resolve().as_posix()] if settings.RECORD_UPDATES_FILE else []),
         "__pycache__",
     ]
 
@@ -56,10 +50,12 @@ def main():
     try:
         # Запускаете бота (или ваши задачи, например, polling)
         loop.run_until_complete(settings.PUNISHMENT_SYSTEM_SERVICE.start())
+        loop.run_until_complete(settings.RESERVATION_SERVICE.start())
+        books = settings.CATALOG_SERVICE.scan()
+        logger.info(f"Каталог: {len(books)} книг в {len(settings.BOOK_ROOTS)} каталогах")
+        loop.run_until_complete(settings.BOOK_VARIANT_SERVICE.start(list(books.values())))
         logger.info(start_bot_text)
-        settings.APP.add_handler(CommandHandler("start", start))
-        settings.APP.add_handler(CallbackQueryHandler(handle_buttons))
-        settings.APP.add_handler(MessageHandler(filters.Document.FileExtension("pdf"), return_book))
+        register_handlers(settings.APP, settings.RECORD_UPDATES_FILE)
 
         settings.APP.run_polling()
 
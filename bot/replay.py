@@ -0,0 +1,98 @@
+"""
+Воспроизведение записанного трафика через обработчики бота с фейковым Bot API.
+
+Запуск:
+    python bot/replay.py updates.jsonl --speed 10
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from application.handlers import register_handlers
+from core.settings import settings
+from domain.book_root import BookRoot
+from infrastructure.update_processor import PriorityUpdateProcessor, get_update_action
+from services.borrow_history import BorrowHistoryService
+from services.update_replay import FakeRequest, UpdateReplayer, load_recording
+from telegram import Bot
+from telegram.ext import ApplicationBuilder
+
+
+def prepare_sandbox(sandbox_dir: Path, bot: Bot):
+    """
+    Направить обработчики на копию каталога книг, вариантов и данных о выдачах,
+    чтобы воспроизведение не трогало настоящую библиотеку, историю выдач и не писало пользователям.
+    """
+    books_dir = sandbox_dir / "books"
+    books_dir.mkdir()
+    # Жёсткие ссылки дешевле копий: удаление при выдаче убирает только ссылку
+    for book_name, path in settings.CATALOG_SERVICE.scan().items():
+        _link_or_copy(path, books_dir / book_name)
+    borrowed_data_file = sandbox_dir / "borrowed_data.json"
+    shutil.copy2(settings.BORROWED_DATA_FILE, borrowed_data_file)
+
+    sandbox_root = BookRoot(name="sandbox", path=books_dir)
+    settings.CATALOG_SERVICE.roots = [sandbox_root]
+    settings.CATALOG_SERVICE.return_root = sandbox_root
+    settings.CATALOG_SERVICE.scan()
+    settings.PUNISHMENT_SYSTEM_SERVICE.bot = bot
+    settings.PUNISHMENT_SYSTEM_SERVICE.borrowed_data_file = borrowed_data_file
+    settings.PUNISHMENT_SYSTEM_SERVICE._load_data()
+    settings.PUNISHMENT_SYSTEM_SERVICE.history = BorrowHistoryService(
+        sandbox_dir / "borrow_events.jsonl", sandbox_dir / "borrow_stats.json"
+    )
+
+    reservations_file = sandbox_dir / "reservations.json"
+    if settings.RESERVATIONS_FILE.exists():
+        shutil.copy2(settings.RESERVATIONS_FILE, reservations_file)
+    settings.RESERVATION_SERVICE.bot = bot
+    settings.RESERVATION_SERVICE.reservations_file = reservations_file
+
+    # Готовые варианты тоже связываем ссылками: при возврате вариант пересобирается и старый удаляется
+    variants = settings.BOOK_VARIANT_SERVICE
+    variants_dir = sandbox_dir / "variants"
+    variants_dir.mkdir()
+    if variants.variants_dir.is_dir():
+        for path in variants.variants_dir.glob("*.pdf"):
+            _link_or_copy(path, variants_dir / path.name)
+    variants.variants_dir = variants_dir
+    variants.manifest_file = variants_dir / "manifest.json"
+
+
+def _link_or_copy(src: Path, dst: Path):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+async def run(record_file: Path, speed: float):
+    request = FakeRequest()
+    bot = Bot(token=settings.BOT_TOKEN or "0:replay", request=request, get_updates_request=FakeRequest())
+    update_processor = PriorityUpdateProcessor(settings.INTERACTIVE_WORKERS, settings.HEAVY_WORKERS)
+    application = ApplicationBuilder().bot(bot).updater(None).concurrent_updates(update_processor).build()
+    register_handlers(application)
+    replayer = UpdateReplayer(application, get_update_action, speed=speed)
+
+    with tempfile.TemporaryDirectory() as sandbox_dir:
+        prepare_sandbox(Path(sandbox_dir), bot)
+        stats = await replayer.replay(load_recording(record_file))
+
+    print(stats.summary())
+    print("Вызовы Bot API:", dict(request.calls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Воспроизведение записанных обновлений")
+    parser.add_argument("record_file", type=Path)
+    parser.add_argument("--speed", type=float, default=1.0, help="ускорение: 1, 10, 100...")
+    args = parser.parse_args()
+    asyncio.run(run(args.record_file, args.speed))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,50 @@
 import io
 import logging
-from pathlib import Path
 
 from core.settings import settings
 from pdf2image import convert_from_path
 
+from services.page_cache import PageRenderCache
+
 logger = logging.getLogger("bot")
 
 
+_page_cache = PageRenderCache(settings.PEEK_CACHE_MB * 1024 * 1024)
+
+
+def render_page(pdf_path: str, page: int) -> bytes | None:
+    """
+    Отрисовать страницу книги в JPEG. Страницы кэшируются, ключ учитывает время изменения файла.
+    """
+    path = settings.CATALOG_SERVICE.get_path(pdf_path)
+    if path is None:
+        return None
+
+    key = (pdf_path, path.stat().st_mtime_ns, page)
+    cached = _page_cache.get(key)
+    if cached is not None:
+        return cached
+
+    images = convert_from_path(path, first_page=page, last_page=page)
+    if not images:
+        return None
+    img_byte_arr = io.BytesIO()
+    images[0].save(img_byte_arr, format="JPEG")
+    _page_cache.put(key, img_byte_arr.getvalue())
+    return img_byte_arr.getvalue()
+
+
+def get_page_count(pdf_path: str) -> int:
+    metadata = settings.CATALOG_SERVICE.get_metadata(pdf_path)
+    return metadata.page_count if metadata else 0
+
+
 def get_pdf_preview_in_memory(pdf_path: str):
     try:
         # Получаем первую страницу PDF в виде изображения
-        images = convert_from_path(Path(settings.BOOKS_DIR, pdf_path), first_page=1, last_page=1)
-        if images:
-            img_byte_arr = io.BytesIO()
-            images[0].save(img_byte_arr, format="JPEG")
-            img_byte_arr.seek(0)  # Перемещаем указатель в начало
-            return img_byte_arr
+        page = render_page(pdf_path, 1)
+        if page:
+            return io.BytesIO(page)
         return None
     except Exception as e:
         logger.error(f"Ошибка при создании превью кники: {e}")
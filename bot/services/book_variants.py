@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+logger = logging.getLogger("bot")
+
+
+class BookVariantService:
+    """
+    Класс для сборки и кэширования облегчённых вариантов PDF для отправки пользователям.
+    """
+
+    # Имя варианта -> команда сборки ({src} и {dst} подставляются при запуске)
+    VARIANT_COMMANDS: dict[str, list[str]] = {
+        "linearized": ["qpdf", "--linearize", "{src}", "{dst}"],
+        "ebook": [
+            "gs",
+            "-sDEVICE=pdfwrite",
+            "-dPDFSETTINGS=/ebook",
+            "-dFastWebView=true",
+            "-dNOPAUSE",
+            "-dBATCH",
+            "-dQUIET",
+            "-sOutputFile={dst}",
+            "{src}",
+        ],
+    }
+
+    def __init__(self, variants_dir: Path, upload_limit_bytes: int, enabled: bool = True):
+        """
+        :param variants_dir: каталог для готовых вариантов и манифеста.
+        :param upload_limit_bytes: максимальный размер файла, который можно отправить через Bot API.
+        :param enabled: собирать ли варианты (без сборки отправляется исходный файл).
+        """
+        self.variants_dir = variants_dir
+        self.upload_limit_bytes = upload_limit_bytes
+        self.enabled = enabled
+        self.manifest_file = variants_dir / "manifest.json"
+
+        # Структура данных: {book_name: {"source_size": int, "source_mtime_ns": int, "variants": {name: size}}}
+        self.manifest = {}
+        self._tasks = {}
+        # Сборка тяжёлая, поэтому выполняем её по одной книге за раз
+        self._build_lock = asyncio.Lock()
+
+        if self.enabled:
+            self.variants_dir.mkdir(parents=True, exist_ok=True)
+            self._load_manifest()
+
+    def _load_manifest(self):
+        if self.manifest_file.exists():
+            with open(self.manifest_file, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def _save_manifest(self):
+        with open(self.manifest_file, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+
+    async def start(self, sources: list[Path]):
+        """
+        Поставить в очередь сборку вариантов для всех книг каталога.
+        """
+        if not self.enabled:
+            return
+        for source in sources:
+            self.schedule_build(source)
+
+    def schedule_build(self, source: Path):
+        """
+        Запустить фоновую сборку вариантов, если кэш для книги устарел.
+        """
+        book_name = source.name
+        if not self.enabled or book_name in self._tasks or self._is_fresh(source):
+            return
+        task = asyncio.create_task(self._build_in_background(source))
+        self._tasks[book_name] = task
+
+    def get_delivery_path(self, source: Path) -> Path | None:
+        """
+        Вернуть самый маленький файл книги, который укладывается в лимит загрузки.
+        Если подходящего файла нет — None.
+        """
+        candidates = [(source.stat().st_size, source)]
+        if self.enabled:
+            if self._is_fresh(source):
+                variants = self.manifest[source.name]["variants"]
+                candidates += [(size, self._variant_path(source.name, name)) for name, size in variants.items()]
+            else:
+                self.schedule_build(source)
+
+        fitting = [(size, path) for size, path in candidates if size <= self.upload_limit_bytes and path.exists()]
+        if not fitting:
+            return None
+        return min(fitting)[1]
+
+    def _variant_path(self, book_name: str, variant: str) -> Path:
+        return self.variants_dir / f"{Path(book_name).stem}.{variant}.pdf"
+
+    def _is_fresh(self, source: Path) -> bool:
+        entry = self.manifest.get(source.name)
+        if not entry or not source.exists():
+            return False
+        stat = source.stat()
+        return entry["source_size"] == stat.st_size and entry["source_mtime_ns"] == stat.st_mtime_ns
+
+    async def _build_in_background(self, source: Path):
+        try:
+            async with self._build_lock:
+                await asyncio.to_thread(self._build, source)
+        except Exception as e:
+            logger.error(f"Ошибка при сборке вариантов книги {source.name}: {e}")
+        finally:
+            self._tasks.pop(source.name, None)
+
+    def _build(self, source: Path):
+        if not source.exists():
+            return
+        stat = source.stat()
+        self._remove_variants(source.name)
+
+        variants = {}
+        for name, command in self.VARIANT_COMMANDS.items():
+            if shutil.which(command[0]) is None:
+                continue
+            dst = self._variant_path(source.name, name)
+            tmp = dst.with_suffix(".tmp")
+            args = [arg.format(src=source, dst=tmp) for arg in command]
+            result = subprocess.run(args, capture_output=True, check=False)
+            if result.returncode != 0 or not tmp.exists():
+                logger.error(f"Не удалось собрать вариант '{name}' книги {source.name}: {result.stderr!r}")
+                tmp.unlink(missing_ok=True)
+                continue
+            os.replace(tmp, dst)
+            variants[name] = dst.stat().st_size
+            reduction = 100 * (1 - variants[name] / stat.st_size) if stat.st_size else 0
+            logger.info(
+                f"Вариант '{name}' книги {source.name}: {stat.st_size} -> {variants[name]} байт (-{reduction:.1f}%)"
+            )
+
+        # Книга могла измениться во время сборки — тогда результат уже неактуален
+        if not source.exists() or source.stat().st_mtime_ns != stat.st_mtime_ns:
+            return
+        self.manifest[source.name] = {
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "variants": variants,
+        }
+        self._save_manifest()
+
+    def _remove_variants(self, book_name: str):
+        entry = self.manifest.pop(book_name, None)
+        if not entry:
+            return
+        for name in entry["variants"]:
+            self._variant_path(book_name, name).unlink(missing_ok=True)
@@ -0,0 +1,182 @@
+import json
+import os
+from collections import Counter
+from pathlib import Path
+
+# Границы корзин гистограммы длительности выдачи в днях: (верхняя граница, подпись)
+DURATION_BUCKETS = ((1, "<1"), (3, "1-3"), (7, "3-7"), (14, "7-14"), (30, "14-30"), (None, "30+"))
+
+
+class BorrowHistoryService:
+    """
+    Класс для журнала событий выдачи/возврата/штрафов и статистики по нему.
+    События дописываются в конец журнала, агрегаты пересчитываются на каждом событии,
+    поэтому запросы статистики не требуют прохода по истории.
+    """
+
+    def __init__(
+        self,
+        events_file: Path,
+        snapshot_file: Path,
+        compact_every: int = 1000,
+        popular_limit: int = 10,
+        repeat_late_threshold: int = 2,
+    ):
+        """
+        :param events_file: JSONL журнал событий.
+        :param snapshot_file: снимок агрегатов, в который сворачивается журнал при компактификации.
+        :param compact_every: через сколько новых событий сворачивать журнал в снимок.
+        :param popular_limit: сколько книг хранить в топе популярных.
+        :param repeat_late_threshold: после скольких просроченных возвратов пользователь считается злостным.
+        """
+        self.events_file = events_file
+        self.snapshot_file = snapshot_file
+        self.compact_every = compact_every
+        self.popular_limit = popular_limit
+        self.repeat_late_threshold = repeat_late_threshold
+
+        self.borrow_counts = Counter()
+        self.duration_histogram = Counter()
+        self.late_returns = Counter()
+        self.fines_by_user = Counter()
+        self.total_returns = 0
+        self.total_loan_days = 0.0
+        self.top_books = []
+        self.repeat_late_users = set()
+
+        self._events_since_compaction = 0
+        self._load()
+
+    def record_borrow(self, user_id: str, book: str, at: str):
+        self._append({"type": "borrow", "user_id": user_id, "book": book, "at": at})
+
+    def record_return(self, user_id: str, book: str, at: str, loan_days: float, overdue_days: int, fine: int):
+        self._append(
+            {
+                "type": "return",
+                "user_id": user_id,
+                "book": book,
+                "at": at,
+                "loan_days": loan_days,
+                "overdue_days": overdue_days,
+                "fine": fine,
+            }
+        )
+
+    def record_fine(self, user_id: str, book: str, at: str, fine: int):
+        self._append({"type": "fine", "user_id": user_id, "book": book, "at": at, "fine": fine})
+
+    def popular_books(self) -> list[tuple[str, int]]:
+        """
+        Самые популярные книги: [(название, количество выдач)].
+        """
+        return [(book, self.borrow_counts[book]) for book in self.top_books]
+
+    def average_loan_days(self) -> float:
+        return self.total_loan_days / self.total_returns if self.total_returns else 0.0
+
+    def _apply(self, event: dict):
+        """
+        Учесть событие в агрегатах.
+        """
+        if event["type"] == "borrow":
+            book = event["book"]
+            self.borrow_counts[book] += 1
+            self._update_top(book)
+        elif event["type"] == "return":
+            user_id = event["user_id"]
+            self.total_returns += 1
+            self.total_loan_days += event["loan_days"]
+            self.duration_histogram[_duration_bucket(event["loan_days"])] += 1
+            self.fines_by_user[user_id] += event["fine"]
+            if event["overdue_days"] > 0:
+                self.late_returns[user_id] += 1
+                if self.late_returns[user_id] >= self.repeat_late_threshold:
+                    self.repeat_late_users.add(user_id)
+
+    def _update_top(self, book: str):
+        # Топ небольшой, поэтому пересортировка дешевле пересчёта по всем книгам
+        if book not in self.top_books:
+            if len(self.top_books) >= self.popular_limit:
+                last = self.top_books[-1]
+                if self.borrow_counts[book] <= self.borrow_counts[last]:
+                    return
+                self.top_books.pop()
+            self.top_books.append(book)
+        self.top_books.sort(key=lambda name: -self.borrow_counts[name])
+
+    def _append(self, event: dict):
+        with open(self.events_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._apply(event)
+
+        self._events_since_compaction += 1
+        if self._events_since_compaction >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """
+        Свернуть журнал в снимок агрегатов и очистить его.
+        """
+        log_size = self.events_file.stat().st_size if self.events_file.exists() else 0
+        self._save_snapshot(log_size)
+        with open(self.events_file, "w", encoding="utf-8"):
+            pass
+        self._save_snapshot(0)
+        self._events_since_compaction = 0
+
+    def _save_snapshot(self, log_offset: int):
+        snapshot = {
+            # Смещение в журнале, с которого события ещё не учтены в снимке
+            "log_offset": log_offset,
+            "borrow_counts": self.borrow_counts,
+            "duration_histogram": self.duration_histogram,
+            "late_returns": self.late_returns,
+            "fines_by_user": self.fines_by_user,
+            "total_returns": self.total_returns,
+            "total_loan_days": self.total_loan_days,
+        }
+        tmp_file = self.snapshot_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.snapshot_file)
+
+    def _load(self):
+        log_offset = 0
+        if self.snapshot_file.exists():
+            with open(self.snapshot_file, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            log_offset = snapshot["log_offset"]
+            self.borrow_counts = Counter(snapshot["borrow_counts"])
+            self.duration_histogram = Counter(snapshot["duration_histogram"])
+            self.late_returns = Counter(snapshot["late_returns"])
+            self.fines_by_user = Counter(snapshot["fines_by_user"])
+            self.total_returns = snapshot["total_returns"]
+            self.total_loan_days = snapshot["total_loan_days"]
+
+        self.top_books = [book for book, _ in self.borrow_counts.most_common(self.popular_limit)]
+        self.repeat_late_users = {
+            user_id for user_id, count in self.late_returns.items() if count >= self.repeat_late_threshold
+        }
+
+        if not self.events_file.exists():
+            return
+        # Журнал очищен, а снимок со старым смещением не успел перезаписаться — все события новые
+        stale_offset = log_offset > self.events_file.stat().st_size
+        if stale_offset:
+            log_offset = 0
+        with open(self.events_file, "rb") as f:
+            f.seek(log_offset)
+            for line in f:
+                if line.strip():
+                    self._apply(json.loads(line))
+                    self._events_since_compaction += 1
+        if stale_offset:
+            self._save_snapshot(self.events_file.stat().st_size)
+
+
+def _duration_bucket(loan_days: float) -> str:
+    for upper, label in DURATION_BUCKETS:
+        if upper is None or loan_days < upper:
+            return label
+    return DURATION_BUCKETS[-1][1]
@@ -0,0 +1,122 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from domain.book_root import BookRoot
+
+from services.pdf_metadata import PdfMetadata, read_pdf_metadata
+
+logger = logging.getLogger("bot")
+
+
+class CatalogService:
+    """
+    Класс для единого каталога книг из нескольких корневых каталогов.
+    Книга определяется именем файла, поэтому её идентификатор не зависит от того, в каком каталоге она лежит.
+    """
+
+    def __init__(self, roots: list[BookRoot], return_root: str):
+        """
+        :param roots: каталоги с книгами.
+        :param return_root: имя каталога, в который сохраняются возвращённые книги.
+        """
+        # При совпадении имён побеждает каталог с большим весом, при равных весах — указанный раньше
+        self.roots = sorted(roots, key=lambda root: -root.weight)
+        self.return_root = next(root for root in roots if root.name == return_root)
+
+        # Структура данных: {book_name: (BookRoot, Path)}
+        self.books = {}
+
+    def scan(self) -> dict[str, Path]:
+        """
+        Параллельно просканировать все каталоги и собрать единый каталог.
+        """
+        with ThreadPoolExecutor(max_workers=len(self.roots)) as executor:
+            listings = list(executor.map(self._scan_root, self.roots))
+
+        books = {}
+        for root, names in zip(self.roots, listings, strict=True):
+            for name in names:
+                books.setdefault(name, (root, Path(root.path, name)))
+        self.books = books
+        return {name: path for name, (_, path) in books.items()}
+
+    @staticmethod
+    def _scan_root(root: BookRoot) -> list[str]:
+        try:
+            return [f for f in os.listdir(root.path) if f.lower().endswith(".pdf")]
+        except OSError as e:
+            logger.error(f"Не удалось прочитать каталог книг {root.path}: {e}")
+            return []
+
+    def get_path(self, book_name: str) -> Path | None:
+        """
+        Путь к файлу книги или None, если её нет в каталоге.
+        Каталог не пересканируется: это делают запуск бота и список книг, а здесь полный обход
+        медленных каталогов заблокировал бы цикл событий.
+        """
+        entry = self.books.get(book_name)
+        if entry is None or not entry[1].exists():
+            return None
+        return entry[1]
+
+    def get_metadata(self, book_name: str) -> PdfMetadata | None:
+        """
+        Количество страниц, название и автор книги без запуска poppler (если файл удаётся разобрать).
+        """
+        path = self.get_path(book_name)
+        if path is None:
+            return None
+        try:
+            return read_pdf_metadata(path)
+        except Exception as e:
+            logger.error(f"Не удалось прочитать метаданные книги {book_name}: {e}")
+            return None
+
+    def remove(self, book_name: str) -> str | None:
+        """
+        Убрать книгу из каталога после выдачи.
+        Из каталогов только для чтения файл не удаляется: доступность таких книг определяется выдачами.
+        Возвращает имя каталога, из которого удалён файл, чтобы при возврате положить книгу туда же.
+        """
+        entry = self.books.get(book_name)
+        if entry is None:
+            return None
+        root, path = entry
+        if not root.writable:
+            return None
+        os.remove(path)
+        del self.books[book_name]
+        return root.name
+
+    def get_return_path(self, book_name: str, removed_from: str | None = None) -> Path | None:
+        """
+        Куда сохранить возвращённую книгу.
+        None — оригинал книги и так лежит в каталоге, сохранять загруженный файл не нужно.
+
+        :param removed_from: каталог, из которого файл удалили при выдаче. После пересканирования
+            каталог может указывать на копию с меньшим весом, поэтому книга возвращается туда, откуда её взяли.
+        """
+        if removed_from is not None:
+            return Path(self._get_restore_root(removed_from).path, book_name)
+        entry = self.books.get(book_name)
+        if entry and entry[1].exists():
+            return None
+        return Path(self.return_root.path, book_name)
+
+    def add_returned(self, book_name: str, removed_from: str | None = None):
+        """
+        Вернуть книгу в каталог после сохранения возвращённого файла.
+        """
+        root = self._get_restore_root(removed_from)
+        entry = self.books.get(book_name)
+        if entry is None or entry[0].weight < root.weight:
+            self.books[book_name] = (root, Path(root.path, book_name))
+
+    def _get_restore_root(self, removed_from: str | None) -> BookRoot:
+        # Каталог могли убрать из настроек или сделать только для чтения — тогда книга идёт в каталог для возвратов
+        for root in self.roots:
+            if root.name == removed_from and root.writable:
+                return root
+        return self.return_root
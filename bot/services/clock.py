@@ -0,0 +1,67 @@
+import asyncio
+import heapq
+import itertools
+from datetime import datetime, timedelta
+
+
+class Clock:
+    """
+    Источник текущего времени и ожиданий для сервисов с периодическими задачами.
+    """
+
+    def now(self) -> datetime:
+        return datetime.utcnow()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class SimulatedClock(Clock):
+    """
+    Виртуальные часы: ожидания не занимают реального времени, время двигается вызовом advance_until.
+    Задачи, которые ждут через эти часы, не должны ждать реального ввода-вывода.
+    """
+
+    def __init__(self, start: datetime, settle_steps: int = 3):
+        """
+        :param start: начальное виртуальное время.
+        :param settle_steps: сколько раз отдать управление циклу событий после пробуждения задач,
+            чтобы они дошли до следующего ожидания.
+        """
+        self._now = start
+        self.settle_steps = settle_steps
+        self.wakeups = 0
+        self._sleepers = []
+        self._counter = itertools.count()
+
+    def now(self) -> datetime:
+        return self._now
+
+    async def sleep(self, seconds: float):
+        future = asyncio.get_running_loop().create_future()
+        wake_at = self._now + timedelta(seconds=max(seconds, 0))
+        heapq.heappush(self._sleepers, (wake_at, next(self._counter), future))
+        await future
+
+    async def _settle(self):
+        for _ in range(self.settle_steps):
+            await asyncio.sleep(0)
+
+    async def advance_until(self, end: datetime):
+        """
+        Прокрутить время до end, по очереди пробуждая все задачи, чьё ожидание истекает раньше.
+        """
+        await self._settle()
+        while self._sleepers and self._sleepers[0][0] <= end:
+            self._now = self._sleepers[0][0]
+            while self._sleepers and self._sleepers[0][0] == self._now:
+                _, _, future = heapq.heappop(self._sleepers)
+                # Отменённые задачи уже не ждут своего пробуждения
+                if not future.done():
+                    future.set_result(None)
+                    self.wakeups += 1
+            await self._settle()
+        self._now = max(self._now, end)
+
+    async def advance(self, delta: timedelta):
+        await self.advance_until(self._now + delta)
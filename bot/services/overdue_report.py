@@ -0,0 +1,173 @@
+"""
+Массовый расчёт просрочек и штрафов по всем выдачам за один проход.
+
+Запуск из каталога bot:
+    python -m services.overdue_report --output overdue.csv
+    python -m services.overdue_report --benchmark 100000
+"""
+
+import argparse
+import csv
+import io
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_DATA_FILE = Path(__file__).resolve().parent.parent / "infrastructure/jsondb/borrowed_data.json"
+REPORT_COLUMNS = ("user_id", "book", "borrowed_at", "due_at", "overdue_days", "fine")
+
+_EPOCH = datetime(1970, 1, 1)
+_SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def build_overdue_report(
+    borrowed_books: dict,
+    max_borrow_period: timedelta,
+    fine_per_day: int,
+    now: datetime | None = None,
+    only_overdue: bool = True,
+) -> dict[str, list]:
+    """
+    Посчитать дни просрочки и штрафы сразу для всех выдач.
+    Отчёт хранится по колонкам: {название колонки: список значений}.
+    Правило расчёта совпадает с PunishmentSystemService._reminder_loop.
+    Если установлен numpy, даты разбираются и считаются массивами datetime64, иначе — поэлементно.
+    """
+    now = now or datetime.utcnow()
+    build = _build_vectorized if np is not None else _build_per_loan
+    return build(borrowed_books, max_borrow_period, fine_per_day, now, only_overdue)
+
+
+def _build_vectorized(
+    borrowed_books: dict, max_borrow_period: timedelta, fine_per_day: int, now: datetime, only_overdue: bool
+) -> dict[str, list]:
+    records = list(borrowed_books.values())
+    user_ids = np.array(list(borrowed_books.keys()), dtype=object)
+    books = np.array([r["book"] for r in records], dtype=object)
+    borrowed_at = np.array([r["borrowed_at"] for r in records], dtype=object)
+
+    due = np.array(borrowed_at.tolist(), dtype="datetime64[us]") + np.timedelta64(max_borrow_period)
+    overdue_days = np.maximum((np.datetime64(now, "us") - due) // np.timedelta64(1, "D"), 0)
+
+    selected = overdue_days > 0 if only_overdue else slice(None)
+    overdue = overdue_days[selected]
+    return {
+        "user_id": user_ids[selected].tolist(),
+        "book": books[selected].tolist(),
+        "borrowed_at": borrowed_at[selected].tolist(),
+        "due_at": np.datetime_as_string(due[selected], unit="s").tolist(),
+        "overdue_days": overdue.tolist(),
+        "fine": (overdue * fine_per_day).tolist(),
+    }
+
+
+def _build_per_loan(
+    borrowed_books: dict, max_borrow_period: timedelta, fine_per_day: int, now: datetime, only_overdue: bool
+) -> dict[str, list]:
+    now_s = (now - _EPOCH).total_seconds()
+    period_s = max_borrow_period.total_seconds()
+
+    user_ids = list(borrowed_books.keys())
+    records = list(borrowed_books.values())
+    borrowed_s = [(datetime.fromisoformat(r["borrowed_at"]) - _EPOCH).total_seconds() for r in records]
+    overdue_days = [max(int((now_s - b - period_s) // _SECONDS_PER_DAY), 0) for b in borrowed_s]
+
+    indexes = range(len(records))
+    if only_overdue:
+        indexes = [i for i, days in enumerate(overdue_days) if days > 0]
+
+    return {
+        "user_id": [user_ids[i] for i in indexes],
+        "book": [records[i]["book"] for i in indexes],
+        "borrowed_at": [records[i]["borrowed_at"] for i in indexes],
+        "due_at": [
+            (_EPOCH + timedelta(seconds=borrowed_s[i] + period_s)).isoformat(timespec="seconds") for i in indexes
+        ],
+        "overdue_days": [overdue_days[i] for i in indexes],
+        "fine": [overdue_days[i] * fine_per_day for i in indexes],
+    }
+
+
+def total_fine(report: dict[str, list]) -> int:
+    return sum(report["fine"])
+
+
+def render_csv(report: dict[str, list]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(REPORT_COLUMNS)
+    writer.writerows(zip(*(report[column] for column in REPORT_COLUMNS), strict=True))
+    return buffer.getvalue()
+
+
+def write_report(report: dict[str, list], output: Path):
+    """
+    Записать отчёт в CSV или Parquet (по расширению файла).
+    Для Parquet нужен pyarrow.
+    """
+    if output.suffix.lower() == ".parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Для отчёта в формате Parquet установите pyarrow") from e
+        pq.write_table(pa.table({column: report[column] for column in REPORT_COLUMNS}), output)
+        return
+
+    with open(output, "w", encoding="utf-8", newline="") as f:
+        f.write(render_csv(report))
+
+
+def benchmark(loans: int, max_borrow_period: timedelta, fine_per_day: int):
+    now = datetime.utcnow()
+    borrowed_books = {
+        str(user_id): {
+            "book": f"book_{user_id}.pdf",
+            "borrowed_at": (now - timedelta(minutes=user_id % (60 * 24 * 60))).isoformat(),
+            "fine": 0,
+        }
+        for user_id in range(loans)
+    }
+    started = time.perf_counter()
+    report = build_overdue_report(borrowed_books, max_borrow_period, fine_per_day, now=now)
+    elapsed = time.perf_counter() - started
+    mode = "numpy" if np is not None else "без numpy"
+    print(f"{loans} выдач ({mode}): {elapsed:.3f} с, просрочено {len(report['user_id'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Отчёт по просроченным книгам и штрафам")
+    parser.add_argument("--data-file", type=Path, default=DEFAULT_DATA_FILE)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--output", type=Path, help="путь к .csv или .parquet")
+    mode.add_argument("--benchmark", type=int, metavar="LOANS", help="замерить расчёт на синтетических выдачах")
+    parser.add_argument("--max-borrow-days", type=int, default=14)
+    parser.add_argument("--fine-per-day", type=int, default=10)
+    parser.add_argument("--all", action="store_true", help="включить выдачи без просрочки")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, timedelta(days=args.max_borrow_days), args.fine_per_day)
+        return
+
+    with open(args.data_file, encoding="utf-8") as f:
+        borrowed_books = json.load(f)
+
+    report = build_overdue_report(
+        borrowed_books,
+        timedelta(days=args.max_borrow_days),
+        args.fine_per_day,
+        only_overdue=not args.all,
+    )
+    write_report(report, args.output)
+    print(f"Просроченных выдач: {len(report['user_id'])}, сумма штрафов: {total_fine(report)} у.е.")
+
+
+if __name__ == "__main__":
+    main()
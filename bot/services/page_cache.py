@@ -0,0 +1,32 @@
+import threading
+from collections import OrderedDict
+
+
+class PageRenderCache:
+    """
+    LRU-кэш отрисованных страниц с ограничением на суммарный размер в байтах.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.size_bytes = 0
+        self._pages = OrderedDict()
+        # Страницы отрисовываются в отдельных потоках
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> bytes | None:
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+            return page
+
+    def put(self, key: tuple, page: bytes):
+        with self._lock:
+            if len(page) > self.budget_bytes or key in self._pages:
+                return
+            self._pages[key] = page
+            self.size_bytes += len(page)
+            while self.size_bytes > self.budget_bytes:
+                _, evicted = self._pages.popitem(last=False)
+                self.size_bytes -= len(evicted)
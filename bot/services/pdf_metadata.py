@@ -0,0 +1,456 @@
+"""
+Лёгкое чтение метаданных PDF без запуска poppler.
+
+Файл отображается в память, читаются только trailer, таблица xref и несколько объектов
+(каталог, дерево страниц, словарь Info). Если разобрать файл не удалось, используется pdfinfo.
+"""
+
+import logging
+import mmap
+import re
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from pdf2image import pdfinfo_from_path
+
+logger = logging.getLogger("bot")
+
+WHITESPACE = b"\x00\t\n\x0c\r "
+DELIMITERS = b"()<>[]{}/%"
+_NUMBER_RE = re.compile(rb"[+-]?(\d+\.?\d*|\.\d+)$")
+_ESCAPES = {ord("n"): b"\n", ord("r"): b"\r", ord("t"): b"\t", ord("b"): b"\b", ord("f"): b"\f"}
+
+# startxref и trailer лежат в последних килобайтах файла
+TAIL_SIZE = 2048
+# Словарь линеаризации обязан быть первым объектом в файле
+LINEARIZATION_WINDOW = 1024
+
+
+class PdfMetadata(NamedTuple):
+    page_count: int
+    title: str | None
+    author: str | None
+    linearized: bool
+
+
+class PdfParseError(Exception):
+    pass
+
+
+class _Ref(NamedTuple):
+    num: int
+    gen: int
+
+
+class _Name(str):
+    pass
+
+
+def read_pdf_metadata(path: Path) -> PdfMetadata:
+    """
+    Метаданные книги: количество страниц, название, автор и признак линеаризации.
+    Результат кэшируется, пока не изменились размер или время изменения файла.
+    """
+    stat = path.stat()
+    return _read_cached(path, stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=4096)
+def _read_cached(path: Path, size: int, mtime_ns: int) -> PdfMetadata:
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _PdfReader(data).read_metadata()
+    except Exception as e:
+        logger.info(f"Не удалось прочитать метаданные {path.name} напрямую ({e}), используем poppler")
+    return _read_with_poppler(path)
+
+
+def _read_with_poppler(path: Path) -> PdfMetadata:
+    info = pdfinfo_from_path(path)
+    return PdfMetadata(
+        page_count=int(info.get("Pages", 0)),
+        title=info.get("Title") or None,
+        author=info.get("Author") or None,
+        linearized=info.get("Optimized") == "yes",
+    )
+
+
+class _PdfReader:
+    def __init__(self, data: mmap.mmap | bytes):
+        self.data = data
+        # {номер объекта: (1, смещение, 0) | (2, номер потока объектов, индекс в потоке)}
+        self.xref = {}
+        self.trailer = {}
+        self._object_streams = {}
+
+    def read_metadata(self) -> PdfMetadata:
+        self._read_xref_chain(self._find_startxref())
+        if "Encrypt" in self.trailer:
+            raise PdfParseError("encrypted document")
+
+        root = self.resolve(self.trailer.get("Root"))
+        pages = self.resolve(root.get("Pages")) if isinstance(root, dict) else None
+        if not isinstance(pages, dict):
+            raise PdfParseError("page tree not found")
+        page_count = self.resolve(pages.get("Count"))
+        if not isinstance(page_count, int):
+            raise PdfParseError("page count not found")
+
+        info = self.resolve(self.trailer.get("Info"))
+        info = info if isinstance(info, dict) else {}
+        return PdfMetadata(
+            page_count=page_count,
+            title=_decode_text(self.resolve(info.get("Title"))),
+            author=_decode_text(self.resolve(info.get("Author"))),
+            linearized=b"/Linearized" in self.data[:LINEARIZATION_WINDOW],
+        )
+
+    def _find_startxref(self) -> int:
+        size = len(self.data)
+        pos = self.data.rfind(b"startxref", max(0, size - TAIL_SIZE))
+        if pos < 0:
+            raise PdfParseError("startxref not found")
+        parser = _Parser(self.data, pos + len(b"startxref"))
+        offset = parser.parse_object()
+        if not isinstance(offset, int):
+            raise PdfParseError("invalid startxref")
+        return offset
+
+    def _read_xref_chain(self, offset: int):
+        seen = set()
+        while offset is not None and offset not in seen:
+            seen.add(offset)
+            trailer = self._read_xref_section(offset)
+            # Более новые секции читаются первыми, их ключи имеют приоритет
+            for key, value in trailer.items():
+                self.trailer.setdefault(key, value)
+            # В гибридных файлах часть объектов описана в дополнительном xref-потоке
+            if isinstance(trailer.get("XRefStm"), int):
+                self._read_xref_section(trailer["XRefStm"])
+            offset = trailer.get("Prev")
+
+    def _read_xref_section(self, offset: int) -> dict:
+        parser = _Parser(self.data, offset)
+        parser.skip_whitespace()
+        if self.data[parser.pos : parser.pos + 4] == b"xref":
+            parser.pos += 4
+            return self._read_xref_table(parser)
+        return self._read_xref_stream(parser)
+
+    def _read_xref_table(self, parser: "_Parser") -> dict:
+        while True:
+            parser.skip_whitespace()
+            if self.data[parser.pos : parser.pos + 7] == b"trailer":
+                parser.pos += 7
+                trailer = parser.parse_object()
+                if not isinstance(trailer, dict):
+                    raise PdfParseError("invalid trailer")
+                return trailer
+            start = parser.parse_object()
+            count = parser.parse_object()
+            if not isinstance(start, int) or not isinstance(count, int):
+                raise PdfParseError("invalid xref subsection")
+            parser.skip_whitespace()
+            for num in range(start, start + count):
+                # Каждая запись — ровно 20 байт: "oooooooooo ggggg n\r\n"
+                entry = self.data[parser.pos : parser.pos + 20]
+                parser.pos += 20
+                if entry[17:18] == b"n":
+                    self.xref.setdefault(num, (1, int(entry[:10]), 0))
+
+    def _read_xref_stream(self, parser: "_Parser") -> dict:
+        header, content = self._read_indirect(parser)
+        if not isinstance(header, dict) or header.get("Type") != "XRef" or content is None:
+            raise PdfParseError("xref stream not found")
+
+        widths = header["W"]
+        index = header.get("Index", [0, header["Size"]])
+        row_size = sum(widths)
+        pos = 0
+        for start, count in zip(index[::2], index[1::2], strict=True):
+            for num in range(start, start + count):
+                row = content[pos : pos + row_size]
+                pos += row_size
+                fields = []
+                field_pos = 0
+                for width in widths:
+                    fields.append(int.from_bytes(row[field_pos : field_pos + width], "big") if width else None)
+                    field_pos += width
+                kind = 1 if fields[0] is None else fields[0]
+                if kind in (1, 2):
+                    self.xref.setdefault(num, (kind, fields[1], fields[2] or 0))
+        return header
+
+    def resolve(self, value: Any, depth: int = 0) -> Any:
+        while isinstance(value, _Ref):
+            if depth > 32:
+                raise PdfParseError("reference loop")
+            value = self._load_object(value.num)
+            depth += 1
+        return value
+
+    def _load_object(self, num: int) -> Any:
+        entry = self.xref.get(num)
+        if entry is None:
+            return None
+        kind, location, index = entry
+        if kind == 1:
+            value, _ = self._read_indirect(_Parser(self.data, location))
+            return value
+
+        objects = self._object_streams.get(location)
+        if objects is None:
+            objects = self._read_object_stream(location)
+            self._object_streams[location] = objects
+        return objects[index] if index < len(objects) else None
+
+    def _read_object_stream(self, num: int) -> list:
+        entry = self.xref.get(num)
+        if entry is None or entry[0] != 1:
+            raise PdfParseError("object stream not found")
+        header, content = self._read_indirect(_Parser(self.data, entry[1]))
+        if content is None:
+            raise PdfParseError("object stream without data")
+
+        parser = _Parser(content, 0)
+        offsets = []
+        for _ in range(header["N"]):
+            parser.parse_object()
+            offsets.append(parser.parse_object())
+        first = header["First"]
+        return [_Parser(content, first + offset).parse_object() for offset in offsets]
+
+    def _read_indirect(self, parser: "_Parser") -> tuple[Any, bytes | None]:
+        """
+        Прочитать объект вида "N G obj ... endobj" и, если это поток, его декодированное содержимое.
+        """
+        parser.parse_object()
+        parser.parse_object()
+        parser.expect_keyword(b"obj")
+        value = parser.parse_object()
+        if not isinstance(value, dict):
+            return value, None
+
+        parser.skip_whitespace()
+        if self.data[parser.pos : parser.pos + 6] != b"stream":
+            return value, None
+        parser.pos += 6
+        if self.data[parser.pos : parser.pos + 2] == b"\r\n":
+            parser.pos += 2
+        elif self.data[parser.pos : parser.pos + 1] in (b"\n", b"\r"):
+            parser.pos += 1
+        length = self.resolve(value.get("Length"))
+        if not isinstance(length, int):
+            raise PdfParseError("stream without length")
+        return value, _decode_stream(value, bytes(self.data[parser.pos : parser.pos + length]))
+
+
+class _Parser:
+    def __init__(self, data: mmap.mmap | bytes, pos: int):
+        self.data = data
+        self.pos = pos
+
+    def skip_whitespace(self):
+        data = self.data
+        while self.pos < len(data):
+            char = data[self.pos]
+            if char in WHITESPACE:
+                self.pos += 1
+            elif char == ord("%"):
+                while self.pos < len(data) and data[self.pos] not in b"\r\n":
+                    self.pos += 1
+            else:
+                break
+
+    def expect_keyword(self, keyword: bytes):
+        self.skip_whitespace()
+        if self.data[self.pos : self.pos + len(keyword)] != keyword:
+            raise PdfParseError(f"expected {keyword!r} at {self.pos}")
+        self.pos += len(keyword)
+
+    def parse_object(self) -> Any:
+        self.skip_whitespace()
+        if self.pos >= len(self.data):
+            raise PdfParseError("unexpected end of data")
+        char = self.data[self.pos : self.pos + 1]
+        if char == b"<":
+            if self.data[self.pos + 1 : self.pos + 2] == b"<":
+                return self._parse_dict()
+            return self._parse_hex_string()
+        if char == b"[":
+            return self._parse_array()
+        if char == b"(":
+            return self._parse_literal_string()
+        if char == b"/":
+            return self._parse_name()
+        return self._parse_token()
+
+    def _read_regular(self) -> bytes:
+        start = self.pos
+        data = self.data
+        while self.pos < len(data) and data[self.pos] not in WHITESPACE and data[self.pos] not in DELIMITERS:
+            self.pos += 1
+        return bytes(data[start : self.pos])
+
+    def _parse_token(self) -> Any:
+        token = self._read_regular()
+        if not token:
+            raise PdfParseError(f"unexpected character at {self.pos}")
+        if token == b"true":
+            return True
+        if token == b"false":
+            return False
+        if token == b"null":
+            return None
+        if not _NUMBER_RE.match(token):
+            raise PdfParseError(f"unexpected token {token!r}")
+        if b"." in token:
+            return float(token)
+
+        number = int(token)
+        # Ссылка "N G R" выглядит как два числа и R — смотрим вперёд
+        saved = self.pos
+        self.skip_whitespace()
+        generation = self._read_regular()
+        if generation.isdigit():
+            self.skip_whitespace()
+            if self._read_regular() == b"R":
+                return _Ref(number, int(generation))
+        self.pos = saved
+        return number
+
+    def _parse_name(self) -> _Name:
+        self.pos += 1
+        raw = self._read_regular()
+        # Символы в именах могут быть закодированы как #xx
+        name = re.sub(rb"#([0-9A-Fa-f]{2})", lambda m: bytes([int(m.group(1), 16)]), raw)
+        return _Name(name.decode("latin-1"))
+
+    def _parse_dict(self) -> dict:
+        self.pos += 2
+        result = {}
+        while True:
+            self.skip_whitespace()
+            if self.data[self.pos : self.pos + 2] == b">>":
+                self.pos += 2
+                return result
+            key = self.parse_object()
+            if not isinstance(key, _Name):
+                raise PdfParseError("dictionary key is not a name")
+            result[str(key)] = self.parse_object()
+
+    def _parse_array(self) -> list:
+        self.pos += 1
+        result = []
+        while True:
+            self.skip_whitespace()
+            if self.data[self.pos : self.pos + 1] == b"]":
+                self.pos += 1
+                return result
+            result.append(self.parse_object())
+
+    def _parse_hex_string(self) -> bytes:
+        end = self.data.find(b">", self.pos)
+        if end < 0:
+            raise PdfParseError("unterminated hex string")
+        digits = re.sub(rb"\s", b"", bytes(self.data[self.pos + 1 : end]))
+        self.pos = end + 1
+        if len(digits) % 2:
+            digits += b"0"
+        return bytes.fromhex(digits.decode("ascii"))
+
+    def _parse_literal_string(self) -> bytes:
+        self.pos += 1
+        data = self.data
+        result = bytearray()
+        depth = 1
+        while self.pos < len(data):
+            char = data[self.pos]
+            self.pos += 1
+            if char == ord("\\"):
+                escaped = data[self.pos]
+                self.pos += 1
+                if escaped in _ESCAPES:
+                    result += _ESCAPES[escaped]
+                elif escaped in b"01234567":
+                    digits = bytes([escaped])
+                    while len(digits) < 3 and data[self.pos] in b"01234567":
+                        digits += bytes([data[self.pos]])
+                        self.pos += 1
+                    result.append(int(digits, 8) & 0xFF)
+                elif escaped == ord("\r"):
+                    # Перенос строки после обратной косой черты игнорируется
+                    if data[self.pos] == ord("\n"):
+                        self.pos += 1
+                elif escaped != ord("\n"):
+                    result.append(escaped)
+            elif char == ord("("):
+                depth += 1
+                result.append(char)
+            elif char == ord(")"):
+                depth -= 1
+                if depth == 0:
+                    return bytes(result)
+                result.append(char)
+            else:
+                result.append(char)
+        raise PdfParseError("unterminated string")
+
+
+def _decode_stream(header: dict, raw: bytes) -> bytes:
+    filters = header.get("Filter")
+    filters = filters if isinstance(filters, list) else [filters] if filters else []
+    params = header.get("DecodeParms")
+    params = params[0] if isinstance(params, list) else params
+    for stream_filter in filters:
+        if stream_filter != "FlateDecode":
+            raise PdfParseError(f"unsupported filter {stream_filter}")
+        raw = zlib.decompress(raw)
+    if isinstance(params, dict) and params.get("Predictor", 1) >= 10:
+        raw = _undo_png_predictor(raw, params.get("Columns", 1))
+    return raw
+
+
+def _undo_png_predictor(data: bytes, columns: int) -> bytes:
+    """
+    Снять PNG-предиктор (используется в xref-потоках), по одному байту на пиксель.
+    """
+    result = bytearray()
+    previous = bytearray(columns)
+    for row_start in range(0, len(data), columns + 1):
+        predictor = data[row_start]
+        row = bytearray(data[row_start + 1 : row_start + 1 + columns])
+        for i in range(len(row)):
+            left = row[i - 1] if i else 0
+            up = previous[i]
+            up_left = previous[i - 1] if i else 0
+            if predictor == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif predictor == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif predictor == 3:
+                row[i] = (row[i] + (left + up) // 2) & 0xFF
+            elif predictor == 4:
+                estimate = left + up - up_left
+                distances = (abs(estimate - left), abs(estimate - up), abs(estimate - up_left))
+                row[i] = (row[i] + (left, up, up_left)[distances.index(min(distances))]) & 0xFF
+        result += row
+        previous = row
+    return bytes(result)
+
+
+def _decode_text(value: Any) -> str | None:
+    """
+    Текстовая строка PDF: UTF-16BE с BOM или PDFDocEncoding (близка к latin-1).
+    """
+    if not isinstance(value, bytes) or not value:
+        return None
+    if value.startswith(b"\xfe\xff"):
+        text = value[2:].decode("utf-16-be", errors="replace")
+    elif value.startswith(b"\xef\xbb\xbf"):
+        text = value[3:].decode("utf-8", errors="replace")
+    else:
+        text = value.decode("latin-1")
+    return text.strip() or None
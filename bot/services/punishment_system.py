@@ -5,6 +5,10 @@ from pathlib import Path
 
 from telegram.ext import Application
 
+from services.borrow_history import BorrowHistoryService
+from services.clock import Clock
+from services.overdue_report import build_overdue_report
+
 
 class PunishmentSystemService:
     """
@@ -18,20 +22,27 @@ class PunishmentSystemService:
         reminder_interval_minutes: int = 60 * 24,
         max_borrow_days: int = 14,
         fine_per_day: int = 10,
+        history: BorrowHistoryService | None = None,
+        clock: Clock | None = None,
     ):
         """
         :param bot: экземпляр telegram.Bot для отправки сообщений.
         :param reminder_interval_minutes: интервал периодического напоминания в минутах.
         :param max_borrow_days: максимальный срок заимствования книги без штрафа.
         :param fine_per_day: сумма штрафа за каждый день просрочки.
+        :param history: журнал событий выдачи для статистики (необязателен).
+        :param clock: источник времени и ожиданий; в симуляции подменяется виртуальными часами.
         """
         self.bot = bot
         self.borrowed_data_file = borrowed_data_file
         self.reminder_interval = timedelta(minutes=reminder_interval_minutes)
         self.max_borrow_period = timedelta(days=max_borrow_days)
         self.fine_per_day = fine_per_day
+        self.history = history
+        self.clock = clock or Clock()
 
-        # Структура данных: {user_id (str): {"book": str, "borrowed_at": ISO str, "fine": int}}
+        # Структура данных: {user_id (str): {"book": str, "borrowed_at": ISO str, "fine": int, "removed_from": str}},
+        # removed_from есть только у книг, файл которых удалён из каталога при выдаче
         self.borrowed_books = {}
 
         self._load_data()
@@ -64,29 +75,59 @@ class PunishmentSystemService:
             task.cancel()
         self._tasks.clear()
 
-    def add_borrow(self, user_id: int, book_name: str):
+    def add_borrow(self, user_id: int, book_name: str, removed_from: str | None = None):
         """
         Добавить запись о выданной книге пользователю с текущим временем.
         Старые напоминания для пользователя сбрасываются.
+
+        :param removed_from: каталог, из которого при выдаче удалён файл книги (вернуть её нужно туда же).
         """
         user_id_str = str(user_id)
-        now = datetime.utcnow().isoformat()
+        now = self.clock.now().isoformat()
         self.borrowed_books[user_id_str] = {"book": book_name, "borrowed_at": now, "fine": 0}
+        if removed_from is not None:
+            self.borrowed_books[user_id_str]["removed_from"] = removed_from
         self._save_data()
+        if self.history:
+            self.history.record_borrow(user_id_str, book_name, now)
         self._ensure_task(user_id_str)
 
-    def return_book(self, user_id: int):
+    def return_book(self, user_id: int) -> bool:
         """
         Пользователь вернул книгу — удаляем запись и прекращаем напоминания.
+        Возвращает False, если у пользователя не было выдачи.
         """
         user_id_str = str(user_id)
-        if user_id_str in self.borrowed_books:
-            self.borrowed_books.pop(user_id_str)
-            self._save_data()
-            if user_id_str in self._tasks:
-                task = self._tasks[user_id_str]
-                task.cancel()
-                del self._tasks[user_id_str]
+        if user_id_str not in self.borrowed_books:
+            return False
+        record = self.borrowed_books.pop(user_id_str)
+        self._save_data()
+        if self.history:
+            self._record_return(user_id_str, record)
+        if user_id_str in self._tasks:
+            task = self._tasks[user_id_str]
+            task.cancel()
+            del self._tasks[user_id_str]
+        return True
+
+    def _record_return(self, user_id_str: str, record: dict):
+        now = self.clock.now()
+        loan_period = now - datetime.fromisoformat(record["borrowed_at"])
+        overdue = loan_period - self.max_borrow_period
+        self.history.record_return(
+            user_id_str,
+            record["book"],
+            now.isoformat(),
+            loan_days=loan_period.total_seconds() / (24 * 60 * 60),
+            overdue_days=overdue.days if overdue > timedelta(0) else 0,
+            fine=record.get("fine", 0),
+        )
+
+    def is_borrowed(self, book_name: str) -> bool:
+        """
+        Выдана ли книга кому-либо сейчас.
+        """
+        return any(record["book"] == book_name for record in self.borrowed_books.values())
 
     def get_user_info(self, user_id: int):
         """
@@ -94,6 +135,14 @@ class PunishmentSystemService:
         """
         return self.borrowed_books.get(str(user_id), None)
 
+    def build_overdue_report(self, only_overdue: bool = True) -> dict[str, list]:
+        """
+        Отчёт по просрочкам и штрафам для всех выдач за один проход.
+        """
+        return build_overdue_report(
+            self.borrowed_books, self.max_borrow_period, self.fine_per_day, only_overdue=only_overdue
+        )
+
     def _ensure_task(self, user_id_str: str):
         """
         Запустить задачу напоминаний, если её нет.
@@ -112,7 +161,7 @@ class PunishmentSystemService:
             record = self.borrowed_books[user_id_str]
             book_name = record["book"]
             borrowed_at = datetime.fromisoformat(record["borrowed_at"])
-            now = datetime.utcnow()
+            now = self.clock.now()
 
             # Время просрочки
             overdue = (now - borrowed_at) - self.max_borrow_period
@@ -124,6 +173,8 @@ class PunishmentSystemService:
                 if record.get("fine", 0) != fine:
                     record["fine"] = fine
                     self._save_data()
+                    if self.history:
+                        self.history.record_fine(user_id_str, book_name, now.isoformat(), fine)
             else:
                 record["fine"] = 0
                 self._save_data()
@@ -145,7 +196,7 @@ class PunishmentSystemService:
                 print(f"Ошибка отправки напоминания пользователю {user_id_str}: {e}")
 
             # Ждём следующий интервал
-            await asyncio.sleep(self.reminder_interval.total_seconds())
+            await self.clock.sleep(self.reminder_interval.total_seconds())
 
     async def _periodic_check_loop(self):
         """
@@ -153,6 +204,7 @@ class PunishmentSystemService:
         (Для случаев новых пользователей среди существующих). Не обязательна при _ensure_task.
         """
         while self._running:
-            for user_id_str in list(self.borrowed_books.keys()):
+            # Проверяем только выдачи без задачи: полный обход на каждой проверке дорог при тысячах выдач
+            for user_id_str in self.borrowed_books.keys() - self._tasks.keys():
                 self._ensure_task(user_id_str)
-            await asyncio.sleep(60 * 10)  # проверять каждые 10 минут
+            await self.clock.sleep(60 * 10)  # проверять каждые 10 минут
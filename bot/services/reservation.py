@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
+
+from services.punishment_system import PunishmentSystemService
+
+logger = logging.getLogger("bot")
+
+
+class ReservationService:
+    """
+    Класс для очередей на выданные книги и удержания возвращённой книги для следующего в очереди.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        reservations_file: Path,
+        hold_hours: int = 24,
+        check_interval_minutes: int = 1,
+        loans: PunishmentSystemService | None = None,
+    ):
+        """
+        :param bot: экземпляр telegram.Bot для уведомлений.
+        :param reservations_file: файл с очередями и удержаниями.
+        :param hold_hours: сколько часов книга ждёт первого в очереди после возврата.
+        :param check_interval_minutes: как часто проверять истёкшие удержания.
+        :param loans: сервис выдач, чтобы не передавать дальше удержание книги, которая уже на руках.
+        """
+        self.bot = bot
+        self.reservations_file = reservations_file
+        self.hold_period = timedelta(hours=hold_hours)
+        self.check_interval = timedelta(minutes=check_interval_minutes)
+        self.loans = loans
+
+        # Очереди: {book: deque[user_id (str)]}, множества — для проверки «уже в очереди» за O(1)
+        self.queues = {}
+        self._members = {}
+        # Удержания: {book: {"user_id": str, "until": ISO str}}
+        self.holds = {}
+
+        self._load_data()
+        self._running = False
+
+    def _load_data(self):
+        if not self.reservations_file.exists():
+            return
+        with open(self.reservations_file, encoding="utf-8") as f:
+            data = json.load(f)
+        self.queues = {book: deque(users) for book, users in data.get("queues", {}).items()}
+        self._members = {book: set(users) for book, users in self.queues.items()}
+        self.holds = data.get("holds", {})
+
+    def _save_data(self):
+        data = {"queues": {book: list(users) for book, users in self.queues.items()}, "holds": self.holds}
+        with open(self.reservations_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    async def start(self):
+        """
+        Запуск задачи, которая передаёт книгу следующему в очереди после истечения удержания.
+        """
+        self._running = True
+        asyncio.create_task(self._expire_holds_loop())  # noqa: RUF006
+
+    async def stop(self):
+        self._running = False
+
+    def reserve(self, user_id: int, book_name: str) -> int | None:
+        """
+        Поставить пользователя в очередь на книгу.
+        Возвращает позицию в очереди или None, если пользователь уже в ней.
+        """
+        user_id_str = str(user_id)
+        members = self._members.setdefault(book_name, set())
+        if user_id_str in members:
+            return None
+        members.add(user_id_str)
+        queue = self.queues.setdefault(book_name, deque())
+        queue.append(user_id_str)
+        self._save_data()
+        return len(queue)
+
+    def is_available_for(self, user_id: int, book_name: str) -> bool:
+        """
+        Можно ли пользователю взять книгу: она не удерживается для кого-то другого.
+        """
+        hold = self.holds.get(book_name)
+        if not hold or self._is_expired(hold):
+            return True
+        return hold["user_id"] == str(user_id)
+
+    def claim(self, user_id: int, book_name: str):
+        """
+        Пользователь взял книгу — снимаем удержание для него.
+        Истёкшее удержание снимается, кто бы ни взял книгу: иначе её «вернули бы» следующему в очереди.
+        """
+        hold = self.holds.get(book_name)
+        if hold and (hold["user_id"] == str(user_id) or self._is_expired(hold)):
+            del self.holds[book_name]
+            self._save_data()
+
+    async def release(self, book_name: str):
+        """
+        Книга вернулась в библиотеку — удерживаем её для следующего в очереди и уведомляем его.
+        Если книга уже удерживается, значит, она не была на руках, и повторный возврат ничего не меняет.
+        """
+        hold = self.holds.get(book_name)
+        if hold and not self._is_expired(hold):
+            return
+        await self._hold_for_next(book_name)
+
+    async def _hold_for_next(self, book_name: str):
+        self.holds.pop(book_name, None)
+        user_id_str = self._dequeue(book_name)
+        if user_id_str is None:
+            self._save_data()
+            return
+
+        until = datetime.utcnow() + self.hold_period
+        self.holds[book_name] = {"user_id": user_id_str, "until": until.isoformat()}
+        self._save_data()
+
+        msg = (
+            f"Книга '{book_name}', которую вы ждали, вернулась в библиотеку! "
+            f"Она забронирована для вас до {until:%d.%m %H:%M} (UTC)."
+        )
+        try:
+            await self.bot.send_message(
+                chat_id=int(user_id_str),
+                text=msg,
+                reply_markup=InlineKeyboardMarkup(
+                    [[InlineKeyboardButton("Забрать", callback_data=f"get_book:{book_name}")]]
+                ),
+            )
+        except Exception as e:
+            logger.error(f"Ошибка отправки уведомления о брони пользователю {user_id_str}: {e}")
+
+    def _dequeue(self, book_name: str) -> str | None:
+        queue = self.queues.get(book_name)
+        if not queue:
+            return None
+        user_id_str = queue.popleft()
+        self._members[book_name].discard(user_id_str)
+        if not queue:
+            del self.queues[book_name]
+            del self._members[book_name]
+        return user_id_str
+
+    @staticmethod
+    def _is_expired(hold: dict) -> bool:
+        return datetime.fromisoformat(hold["until"]) <= datetime.utcnow()
+
+    async def _expire_holds_loop(self):
+        """
+        Передать книгу следующему в очереди, если предыдущий не забрал её вовремя.
+        """
+        while self._running:
+            await self.expire_holds()
+            await asyncio.sleep(self.check_interval.total_seconds())
+
+    async def expire_holds(self):
+        for book_name, hold in list(self.holds.items()):
+            if not self._is_expired(hold):
+                continue
+            if self.loans and self.loans.is_borrowed(book_name):
+                # Книгу уже взяли — следующего в очереди уведомим, когда её вернут
+                del self.holds[book_name]
+                self._save_data()
+            else:
+                await self._hold_for_next(book_name)
@@ -0,0 +1,200 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from services.clock import SimulatedClock
+from services.punishment_system import PunishmentSystemService
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SIMULATION_START = datetime(2025, 1, 1)
+
+
+class CountingBot:
+    """
+    Бот-заглушка: ничего не отправляет, только считает сообщения.
+    """
+
+    def __init__(self):
+        self.messages_sent = 0
+
+    async def send_message(self, chat_id: int, text: str, **kwargs):
+        self.messages_sent += 1
+
+
+class SimulatedPunishmentSystemService(PunishmentSystemService):
+    """
+    Сервис штрафов, который не пишет файл данных, а считает записи и их примерный объём.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.store_writes = 0
+        super().__init__(*args, **kwargs)
+
+    def _load_data(self):
+        self.borrowed_books = {}
+
+    def _save_data(self):
+        self.store_writes += 1
+
+
+@dataclass
+class SimulationReport:
+    loans: int
+    days: int
+    returned: int
+    messages_sent: int
+    fines_accrued: int
+    store_writes: int
+    store_bytes: int
+    peak_memory_bytes: int
+    wall_seconds: float
+
+    def summary(self) -> str:
+        return (
+            f"Симуляция: {self.loans} выдач, {self.days} дн., возвращено {self.returned}\n"
+            f"Отправлено сообщений: {self.messages_sent}\n"
+            f"Начислено штрафов: {self.fines_accrued} у.е.\n"
+            f"Записей в хранилище: {self.store_writes} (~{self.store_bytes / 1024 / 1024:.1f} МБ)\n"
+            f"Пик памяти: {self.peak_memory_bytes / 1024 / 1024:.1f} МБ\n"
+            f"Реальное время: {self.wall_seconds:.2f} с"
+        )
+
+
+def get_peak_rss() -> int:
+    if resource is None:
+        return 0
+    # В Linux ru_maxrss в килобайтах
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def run_simulation(
+    loans: int,
+    days: int,
+    reminder_interval_minutes: int = 60 * 24,
+    max_borrow_days: int = 14,
+    fine_per_day: int = 10,
+    return_rate: float = 0.5,
+    seed: int = 0,
+    trace_memory: bool = False,
+) -> SimulationReport:
+    """
+    Проиграть напоминания и штрафы для синтетических выдач на виртуальных часах.
+
+    :param loans: сколько выдач создать; даты выдачи равномерно распределены в пределах двух сроков до начала.
+    :param days: сколько виртуальных дней прокрутить.
+    :param return_rate: доля выдач, которые вернут в случайный момент симуляции.
+    :param seed: зерно генератора, чтобы прогоны были воспроизводимы.
+    :param trace_memory: считать пик памяти через tracemalloc (точнее, но в несколько раз медленнее);
+        иначе берётся пиковый RSS процесса.
+    """
+    rng = random.Random(seed)
+    clock = SimulatedClock(SIMULATION_START)
+    bot = CountingBot()
+    end = SIMULATION_START + timedelta(days=days)
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    # Файл данных не открывается: запись и чтение переопределены в симуляционном сервисе
+    service = SimulatedPunishmentSystemService(
+        bot,
+        Path(os.devnull),
+        reminder_interval_minutes=reminder_interval_minutes,
+        max_borrow_days=max_borrow_days,
+        fine_per_day=fine_per_day,
+        clock=clock,
+    )
+
+    loan_spread = timedelta(days=max_borrow_days * 2).total_seconds()
+    for user_id in range(1, loans + 1):
+        borrowed_at = SIMULATION_START - timedelta(seconds=rng.uniform(0, loan_spread))
+        service.borrowed_books[str(user_id)] = {
+            "book": f"book_{user_id % 500}.pdf",
+            "borrowed_at": borrowed_at.isoformat(),
+            "fine": 0,
+        }
+
+    returned_fines = []
+
+    async def return_later(user_id: int, delay: float):
+        await clock.sleep(delay)
+        record = service.get_user_info(user_id)
+        if record:
+            returned_fines.append(record.get("fine", 0))
+            service.return_book(user_id)
+
+    returners = [
+        asyncio.create_task(return_later(user_id, rng.uniform(0, days * 24 * 60 * 60)))
+        for user_id in range(1, loans + 1)
+        if rng.random() < return_rate
+    ]
+
+    await service.start()
+    await clock.advance_until(end)
+    await service.stop()
+    for task in returners:
+        task.cancel()
+
+    wall_seconds = time.perf_counter() - started
+    if trace_memory:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    else:
+        peak_memory = get_peak_rss()
+
+    # Сервис каждый раз переписывает файл целиком; объём оцениваем по размеру итогового снимка
+    snapshot_size = len(json.dumps(service.borrowed_books, ensure_ascii=False, indent=2).encode())
+    fines = sum(returned_fines) + sum(record.get("fine", 0) for record in service.borrowed_books.values())
+    return SimulationReport(
+        loans=loans,
+        days=days,
+        returned=len(returned_fines),
+        messages_sent=bot.messages_sent,
+        fines_accrued=fines,
+        store_writes=service.store_writes,
+        store_bytes=service.store_writes * snapshot_size,
+        peak_memory_bytes=peak_memory,
+        wall_seconds=wall_seconds,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ускоренная симуляция напоминаний и штрафов")
+    parser.add_argument("--loans", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--reminder-interval-minutes", type=int, default=60 * 24)
+    parser.add_argument("--max-borrow-days", type=int, default=14)
+    parser.add_argument("--fine-per-day", type=int, default=10)
+    parser.add_argument("--return-rate", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="пик памяти через tracemalloc")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run_simulation(
+            args.loans,
+            args.days,
+            reminder_interval_minutes=args.reminder_interval_minutes,
+            max_borrow_days=args.max_borrow_days,
+            fine_per_day=args.fine_per_day,
+            return_rate=args.return_rate,
+            seed=args.seed,
+            trace_memory=args.trace_memory,
+        )
+    )
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
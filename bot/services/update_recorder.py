@@ -0,0 +1,77 @@
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+logger = logging.getLogger("bot")
+
+# Персональные данные, которые не попадают в запись
+PERSONAL_FIELDS = {"last_name", "username", "phone_number", "language_code", "title", "bio"}
+# Обязательные поля с персональными данными заменяются заглушкой
+PLACEHOLDER_FIELDS = {"first_name": "user"}
+# Объекты, у которых поле "id" — идентификатор пользователя или чата
+ID_OWNERS = {"from", "chat", "user", "sender_chat"}
+# Произвольный текст от пользователя: сохраняются только команды
+FREE_TEXT_FIELDS = {"text", "caption"}
+
+
+def sanitize_update(data: Any, salt: str, owner: str | None = None) -> Any:
+    """
+    Убрать из update персональные данные.
+    Идентификаторы пользователей и чатов заменяются стабильным хешем, чтобы
+    последовательности действий одного пользователя сохранялись при воспроизведении.
+    """
+    if isinstance(data, list):
+        return [sanitize_update(item, salt, owner) for item in data]
+    if not isinstance(data, dict):
+        return data
+
+    result = {}
+    for key, value in data.items():
+        if key in PERSONAL_FIELDS:
+            continue
+        if key in PLACEHOLDER_FIELDS:
+            result[key] = PLACEHOLDER_FIELDS[key]
+        elif key == "id" and owner in ID_OWNERS:
+            result[key] = _hash_id(value, salt)
+        elif key in FREE_TEXT_FIELDS and isinstance(value, str) and not value.startswith("/"):
+            # Сохраняем только команды, произвольный текст не нужен для нагрузки
+            result[key] = ""
+        else:
+            result[key] = sanitize_update(value, salt, key)
+    return result
+
+
+def _hash_id(value: int, salt: str) -> int:
+    digest = hashlib.sha256(f"{salt}:{value}".encode()).hexdigest()
+    return int(digest[:8], 16) & 0x7FFFFFFF
+
+
+class UpdateRecorder:
+    """
+    Класс для записи входящих обновлений в JSONL файл для последующего воспроизведения.
+    """
+
+    def __init__(self, record_file: Path, salt: str | None = None):
+        """
+        :param record_file: файл, в который дописываются обновления.
+        :param salt: соль для хеширования идентификаторов (по умолчанию своя на каждый запуск).
+        """
+        self.record_file = record_file
+        self.salt = salt or hashlib.sha256(str(time.time_ns()).encode()).hexdigest()
+
+    async def record(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        try:
+            line = json.dumps(
+                {"ts": time.time(), "update": sanitize_update(update.to_dict(), self.salt)},
+                ensure_ascii=False,
+            )
+            with open(self.record_file, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except Exception as e:
+            logger.error(f"Не удалось записать обновление {update.update_id}: {e}")
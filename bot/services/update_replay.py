@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from pathlib import Path
+
+from telegram import Update
+from telegram.ext import Application, ContextTypes
+from telegram.request import BaseRequest, RequestData
+
+logger = logging.getLogger("bot")
+
+FAKE_BOT_USER = {"id": 1, "is_bot": True, "first_name": "ReplayBot", "username": "replay_bot"}
+FAKE_FILE_CONTENT = b"%PDF-1.4\n%%EOF\n"
+
+
+class FakeRequest(BaseRequest):
+    """
+    Транспорт Bot API, который ничего не отправляет и отвечает правдоподобными заглушками.
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+
+    @property
+    def read_timeout(self) -> float | None:
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: RequestData | None = None,
+        read_timeout=None,
+        write_timeout=None,
+        connect_timeout=None,
+        pool_timeout=None,
+    ) -> tuple[int, bytes]:
+        # Скачивание файла (File.download_to_drive) идёт по отдельному URL
+        if "/file/bot" in url:
+            self.calls["download"] += 1
+            return 200, FAKE_FILE_CONTENT
+
+        endpoint = url.rsplit("/", 1)[-1]
+        self.calls[endpoint] += 1
+        parameters = request_data.parameters if request_data else {}
+        return 200, json.dumps({"ok": True, "result": self._result(endpoint, parameters)}).encode()
+
+    @staticmethod
+    def _result(endpoint: str, parameters: dict):
+        if endpoint == "getMe":
+            return FAKE_BOT_USER
+        if endpoint == "getFile":
+            file_id = parameters.get("file_id", "file")
+            return {"file_id": file_id, "file_unique_id": file_id, "file_path": f"documents/{file_id}.pdf"}
+        if endpoint.startswith(("send", "edit")):
+            chat_id = parameters.get("chat_id", 1)
+            return {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": int(chat_id) if str(chat_id).lstrip("-").isdigit() else 1, "type": "private"},
+            }
+        return True
+
+
+class ReplayStats:
+    """
+    Статистика воспроизведения: задержки по обработчикам, глубина очереди и ошибки.
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.queue_waits = defaultdict(list)
+        self.errors = Counter()
+        self.queue_depths = []
+
+    def summary(self) -> str:
+        lines = [
+            f"{'действие':<20}{'кол-во':>8}{'p50 мс':>10}{'p95 мс':>10}{'макс мс':>10}{'ожид. мс':>10}{'ошибки':>8}"
+        ]
+        for action, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            waits = self.queue_waits[action]
+            lines.append(
+                f"{action:<20}{len(ordered):>8}"
+                f"{_percentile(ordered, 0.5) * 1000:>10.1f}"
+                f"{_percentile(ordered, 0.95) * 1000:>10.1f}"
+                f"{ordered[-1] * 1000:>10.1f}"
+                f"{sum(waits) / len(waits) * 1000:>10.1f}"
+                f"{self.errors[action]:>8}"
+            )
+        if self.queue_depths:
+            lines.append(
+                f"Глубина очереди: макс {max(self.queue_depths)}, "
+                f"средняя {sum(self.queue_depths) / len(self.queue_depths):.1f}"
+            )
+        return "\n".join(lines)
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def load_recording(record_file: Path) -> list[dict]:
+    with open(record_file, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class UpdateReplayer:
+    """
+    Класс для воспроизведения записанных обновлений через обработчики приложения с ускорением.
+    """
+
+    def __init__(self, application: Application, classify: Callable[[Update], str], speed: float = 1.0):
+        """
+        :param application: приложение с зарегистрированными обработчиками и фейковым ботом.
+        :param classify: функция, возвращающая имя действия для update (ключ статистики).
+        :param speed: во сколько раз быстрее реального времени подавать обновления.
+        """
+        self.application = application
+        self.classify = classify
+        self.speed = speed
+        self.stats = ReplayStats()
+        self._pending = 0
+
+        application.add_error_handler(self._on_error)
+
+    async def replay(self, records: list[dict]) -> ReplayStats:
+        if not records:
+            return self.stats
+
+        await self.application.initialize()
+        try:
+            first_ts = records[0]["ts"]
+            started = time.monotonic()
+            tasks = []
+            for record in records:
+                delay = (record["ts"] - first_ts) / self.speed - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                update = Update.de_json(record["update"], self.application.bot)
+                self._pending += 1
+                self.stats.queue_depths.append(self._pending)
+                coroutine = self._process(update, time.monotonic())
+                # Обработка идёт через update_processor, как и в боевом приложении
+                tasks.append(asyncio.create_task(self.application.update_processor.process_update(update, coroutine)))
+            await asyncio.gather(*tasks)
+        finally:
+            await self.application.shutdown()
+        return self.stats
+
+    async def _process(self, update: Update, dispatched_at: float):
+        action = self.classify(update)
+        started = time.monotonic()
+        self._pending -= 1
+        self.stats.queue_waits[action].append(started - dispatched_at)
+        await self.application.process_update(update)
+        self.stats.latencies[action].append(time.monotonic() - started)
+
+    async def _on_error(self, update: object, context: ContextTypes.DEFAULT_TYPE):
+        action = self.classify(update) if isinstance(update, Update) else "other"
+        self.stats.errors[action] += 1
+        logger.error(f"Ошибка при воспроизведении ({action}): {context.error}")
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Модули бота импортируются относительно каталога bot (как при запуске bot/main.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "bot"))
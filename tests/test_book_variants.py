@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from services.book_variants import BookVariantService
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "books" / "big.pdf"
+    path.parent.mkdir()
+    path.write_bytes(b"x" * 1000)
+    return path
+
+
+@pytest.fixture
+def service(tmp_path, source):
+    service = BookVariantService(tmp_path / "variants", upload_limit_bytes=500)
+    scheduled = []
+    service.schedule_build = scheduled.append
+    service.scheduled = scheduled
+
+    # Варианты собираются qpdf и ghostscript, поэтому в тестах раскладываем готовые файлы сами
+    variants = {"linearized": 400, "ebook": 200}
+    for name, size in variants.items():
+        service._variant_path(source.name, name).write_bytes(b"v" * size)
+    stat = source.stat()
+    service.manifest[source.name] = {
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "variants": variants,
+    }
+    return service
+
+
+def test_smallest_fitting_variant_is_delivered(service, source):
+    assert service.get_delivery_path(source) == service._variant_path(source.name, "ebook")
+
+    service.upload_limit_bytes = 5000
+    assert service.get_delivery_path(source) == service._variant_path(source.name, "ebook")
+
+
+def test_none_when_nothing_fits(service, source):
+    service.upload_limit_bytes = 100
+    assert service.get_delivery_path(source) is None
+
+
+def test_changed_source_invalidates_variants(service, source):
+    source.write_bytes(b"y" * 300)
+    assert service.get_delivery_path(source) == source
+    assert service.scheduled == [source]
+
+    # Тот же размер, но другое время изменения — кэш тоже устарел
+    service.scheduled.clear()
+    service.manifest[source.name]["source_size"] = 300
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert service.get_delivery_path(source) == source
+    assert service.scheduled == [source]
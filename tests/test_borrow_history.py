@@ -0,0 +1,42 @@
+import pytest
+
+from services.borrow_history import BorrowHistoryService
+
+
+@pytest.fixture
+def history(tmp_path):
+    return BorrowHistoryService(tmp_path / "events.jsonl", tmp_path / "stats.json", popular_limit=2)
+
+
+def borrow_and_return(history, user_id, book, loan_days=3.0, overdue_days=0, fine=0):
+    history.record_borrow(user_id, book, "2025-01-01T00:00:00")
+    history.record_return(user_id, book, "2025-01-04T00:00:00", loan_days, overdue_days, fine)
+
+
+def test_popular_books_keeps_top(history):
+    for book, times in (("a.pdf", 1), ("b.pdf", 3), ("c.pdf", 2)):
+        for _ in range(times):
+            borrow_and_return(history, "1", book)
+
+    assert history.popular_books() == [("b.pdf", 3), ("c.pdf", 2)]
+
+
+def test_durations_and_late_returners(history):
+    borrow_and_return(history, "1", "a.pdf", loan_days=2.0)
+    borrow_and_return(history, "2", "a.pdf", loan_days=20.0, overdue_days=6, fine=60)
+    borrow_and_return(history, "2", "b.pdf", loan_days=16.0, overdue_days=2, fine=20)
+
+    assert history.average_loan_days() == pytest.approx(38 / 3)
+    assert history.duration_histogram == {"1-3": 1, "14-30": 2}
+    assert history.repeat_late_users == {"2"}
+    assert history.fines_by_user["2"] == 80
+
+
+def test_state_survives_restart_and_compaction(tmp_path, history):
+    borrow_and_return(history, "1", "a.pdf")
+    history.compact()
+    borrow_and_return(history, "1", "a.pdf")
+
+    restored = BorrowHistoryService(tmp_path / "events.jsonl", tmp_path / "stats.json", popular_limit=2)
+    assert restored.popular_books() == [("a.pdf", 2)]
+    assert restored.total_returns == 2
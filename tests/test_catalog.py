@@ -0,0 +1,85 @@
+import pytest
+
+from domain.book_root import BookRoot
+from services.catalog import CatalogService
+
+
+@pytest.fixture
+def roots(tmp_path):
+    fast = tmp_path / "fast"
+    archive = tmp_path / "archive"
+    fast.mkdir()
+    archive.mkdir()
+    (fast / "shared.pdf").write_bytes(b"fast")
+    (archive / "shared.pdf").write_bytes(b"archive")
+    (archive / "old.pdf").write_bytes(b"old")
+    (archive / "notes.txt").write_bytes(b"skip")
+    return [
+        BookRoot(name="archive", path=archive, weight=1, writable=False),
+        BookRoot(name="fast", path=fast, weight=2, writable=True),
+    ]
+
+
+def test_scan_merges_roots_by_weight(roots):
+    catalog = CatalogService(roots, return_root="fast")
+    books = catalog.scan()
+
+    assert set(books) == {"shared.pdf", "old.pdf"}
+    assert books["shared.pdf"].read_bytes() == b"fast"
+
+
+def test_read_only_books_are_not_deleted(roots):
+    catalog = CatalogService(roots, return_root="fast")
+    catalog.scan()
+
+    catalog.remove("old.pdf")
+    assert catalog.get_path("old.pdf").exists()
+    assert catalog.get_return_path("old.pdf") is None
+
+
+def test_returned_books_go_to_return_root(roots):
+    catalog = CatalogService(roots, return_root="fast")
+    catalog.scan()
+
+    catalog.remove("shared.pdf")
+    return_path = catalog.get_return_path("shared.pdf")
+    assert return_path == roots[1].path / "shared.pdf"
+
+    return_path.write_bytes(b"returned")
+    catalog.add_returned("shared.pdf")
+    assert catalog.get_path("shared.pdf") == return_path
+
+
+def test_kept_original_is_not_replaced_on_return(roots):
+    catalog = CatalogService(roots, return_root="fast")
+    catalog.scan()
+
+    # Читателю отправили сжатый вариант, оригинал остался на диске
+    assert catalog.get_return_path("shared.pdf") is None
+
+
+def test_get_path_uses_cached_catalog(roots):
+    catalog = CatalogService(roots, return_root="fast")
+    catalog.scan()
+
+    (roots[1].path / "new.pdf").write_bytes(b"new")
+    assert catalog.get_path("new.pdf") is None
+
+    catalog.scan()
+    assert catalog.get_path("new.pdf") == roots[1].path / "new.pdf"
+
+
+def test_book_returns_to_root_it_was_borrowed_from(roots):
+    catalog = CatalogService(roots, return_root="fast")
+    catalog.scan()
+
+    removed_from = catalog.remove("shared.pdf")
+    assert removed_from == "fast"
+    # После пересканирования каталог указывает на копию в архиве
+    assert catalog.scan()["shared.pdf"] == roots[0].path / "shared.pdf"
+
+    return_path = catalog.get_return_path("shared.pdf", removed_from)
+    assert return_path == roots[1].path / "shared.pdf"
+    return_path.write_bytes(b"returned")
+    catalog.add_returned("shared.pdf", removed_from)
+    assert catalog.get_path("shared.pdf") == return_path
@@ -0,0 +1,80 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+from telegram import InputFile
+from telegram.error import TimedOut
+from telegram.request import HTTPXRequest, RequestData
+from telegram.request._requestparameter import RequestParameter
+
+from infrastructure.http_transport import MeasuredRequest, RoutingRequest
+
+API_URL = "https://api.telegram.org/bot123:abc"
+
+
+@pytest.fixture
+def routing():
+    default = Mock(do_request=AsyncMock(return_value=(200, b"default")))
+    media = Mock(do_request=AsyncMock(return_value=(200, b"media")))
+    return RoutingRequest(default, media)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "url",
+    [
+        f"{API_URL}/sendDocument",
+        f"{API_URL}/editMessageMedia",
+        "https://api.telegram.org/file/bot123:abc/documents/file_1.pdf",
+    ],
+)
+async def test_uploads_and_downloads_go_to_media_pool(routing, url):
+    assert await routing.do_request(url, "POST") == (200, b"media")
+    routing.default.do_request.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("endpoint", ["sendMessage", "answerCallbackQuery", "getFile", "editMessageText"])
+async def test_other_methods_go_to_default_pool(routing, endpoint):
+    assert await routing.do_request(f"{API_URL}/{endpoint}", "POST") == (200, b"default")
+    routing.media.do_request.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_pool_exhaustion_raises_timed_out(monkeypatch):
+    release = asyncio.Event()
+
+    async def slow_request(self, url, method, request_data=None, *args, **kwargs):
+        await release.wait()
+        return 200, b"ok"
+
+    monkeypatch.setattr(HTTPXRequest, "do_request", slow_request)
+    request = MeasuredRequest("media", connection_pool_size=1, pool_timeout=0.05, pool_wait_warning=1.0)
+
+    busy = asyncio.create_task(request.do_request(f"{API_URL}/sendDocument", "POST"))
+    await asyncio.sleep(0)
+    with pytest.raises(TimedOut):
+        await request.do_request(f"{API_URL}/sendDocument", "POST")
+
+    # Освободившееся соединение снова выдаётся
+    release.set()
+    assert await busy == (200, b"ok")
+    assert await request.do_request(f"{API_URL}/sendPhoto", "POST") == (200, b"ok")
+    assert request.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_uploads_use_media_write_timeout(monkeypatch):
+    request = MeasuredRequest(
+        "media", connection_pool_size=1, pool_timeout=1, pool_wait_warning=1.0, write_timeout=5, media_write_timeout=60
+    )
+    send = AsyncMock(return_value=httpx.Response(200, content=b"ok"))
+    monkeypatch.setattr(request._client, "request", send)
+
+    upload = RequestData([RequestParameter.from_input("document", InputFile(b"%PDF-1.4", filename="book.pdf"))])
+    await request.do_request(f"{API_URL}/sendDocument", "POST", upload)
+    assert send.call_args.kwargs["timeout"].write == 60
+
+    await request.do_request(f"{API_URL}/sendMessage", "POST", RequestData([]))
+    assert send.call_args.kwargs["timeout"].write == 5
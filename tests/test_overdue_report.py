@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services import overdue_report
+from services.overdue_report import build_overdue_report, render_csv, total_fine, write_report
+
+NOW = datetime(2025, 3, 1, 12, 0)
+
+
+def make_loans(count, borrowed_days_ago):
+    return {
+        str(user_id): {
+            "book": f"book_{user_id}.pdf",
+            "borrowed_at": (NOW - timedelta(days=borrowed_days_ago)).isoformat(),
+            "fine": 0,
+        }
+        for user_id in range(count)
+    }
+
+
+def test_overdue_days_and_fine():
+    loans = make_loans(1, borrowed_days_ago=17)
+    loans["on_time"] = {"book": "fresh.pdf", "borrowed_at": (NOW - timedelta(days=2)).isoformat(), "fine": 0}
+
+    report = build_overdue_report(loans, timedelta(days=14), fine_per_day=10, now=NOW)
+
+    assert report["user_id"] == ["0"]
+    assert report["overdue_days"] == [3]
+    assert report["fine"] == [30]
+    assert total_fine(report) == 30
+
+
+def test_report_includes_all_loans_when_requested():
+    loans = make_loans(3, borrowed_days_ago=1)
+    report = build_overdue_report(loans, timedelta(days=14), fine_per_day=10, now=NOW, only_overdue=False)
+    assert report["overdue_days"] == [0, 0, 0]
+
+
+def test_csv_export(tmp_path):
+    report = build_overdue_report(make_loans(2, borrowed_days_ago=20), timedelta(days=14), 5, now=NOW)
+    output = tmp_path / "report.csv"
+    write_report(report, output)
+
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "user_id,book,borrowed_at,due_at,overdue_days,fine"
+    assert len(lines) == 3
+    assert render_csv(report).splitlines() == lines
+
+
+def test_vectorized_and_per_loan_sweeps_agree(monkeypatch):
+    np = pytest.importorskip("numpy")
+    loans = {
+        str(minutes): {
+            "book": f"book_{minutes}.pdf",
+            "borrowed_at": (NOW - timedelta(minutes=minutes, microseconds=minutes % 7)).isoformat(),
+            "fine": 0,
+        }
+        # Шаг в 7 минут даёт выдачи ровно на границе суток и рядом с ней
+        for minutes in range(0, 60 * 24 * 40, 7)
+    }
+
+    for only_overdue in (True, False):
+        vectorized = build_overdue_report(loans, timedelta(days=14), 10, now=NOW, only_overdue=only_overdue)
+        monkeypatch.setattr(overdue_report, "np", None)
+        per_loan = build_overdue_report(loans, timedelta(days=14), 10, now=NOW, only_overdue=only_overdue)
+        monkeypatch.setattr(overdue_report, "np", np)
+        assert vectorized == per_loan
@@ -0,0 +1,37 @@
+from services.page_cache import PageRenderCache
+
+
+def test_least_recently_used_page_is_evicted():
+    cache = PageRenderCache(budget_bytes=30)
+    cache.put(("a.pdf", 1, 1), b"x" * 10)
+    cache.put(("a.pdf", 1, 2), b"x" * 10)
+    cache.put(("a.pdf", 1, 3), b"x" * 10)
+
+    # Обращение к первой странице делает её самой свежей
+    assert cache.get(("a.pdf", 1, 1)) is not None
+    cache.put(("a.pdf", 1, 4), b"x" * 10)
+
+    assert cache.get(("a.pdf", 1, 2)) is None
+    assert cache.get(("a.pdf", 1, 1)) is not None
+    assert cache.get(("a.pdf", 1, 4)) is not None
+
+
+def test_size_stays_within_budget():
+    cache = PageRenderCache(budget_bytes=25)
+    for page in range(1, 6):
+        cache.put(("a.pdf", 1, page), b"x" * 10)
+        assert cache.size_bytes <= cache.budget_bytes
+
+    assert cache.size_bytes == 20
+    assert cache.get(("a.pdf", 1, 5)) is not None
+
+
+def test_page_larger_than_budget_is_not_cached():
+    cache = PageRenderCache(budget_bytes=10)
+    cache.put(("a.pdf", 1, 1), b"x" * 5)
+    cache.put(("a.pdf", 1, 2), b"x" * 11)
+
+    assert cache.get(("a.pdf", 1, 2)) is None
+    # Слишком большая страница не вытесняет уже закэшированные
+    assert cache.get(("a.pdf", 1, 1)) is not None
+    assert cache.size_bytes == 5
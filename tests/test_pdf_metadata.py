@@ -0,0 +1,104 @@
+import zlib
+
+from services import pdf_metadata
+from services.pdf_metadata import PdfMetadata, read_pdf_metadata
+
+
+def build_pdf(objects, trailer):
+    """
+    Собрать PDF с классической таблицей xref: objects — {номер: тело объекта}.
+    """
+    content = b"%PDF-1.4\n"
+    offsets = {}
+    for num, body in objects.items():
+        offsets[num] = len(content)
+        content += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref_offset = len(content)
+    size = max(objects) + 1
+    content += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for num in range(1, size):
+        content += b"%010d 00000 n \n" % offsets[num]
+    content += b"trailer\n" + trailer % size + b"\nstartxref\n%d\n%%%%EOF\n" % xref_offset
+    return content
+
+
+def build_pdf_with_object_stream(count):
+    """
+    Собрать PDF 1.5, где каталог и дерево страниц лежат в сжатом потоке объектов,
+    а таблица xref — в потоке с PNG-предиктором.
+    """
+    stored = [b"<< /Type /Catalog /Pages 2 0 R >>", b"<< /Type /Pages /Kids [] /Count %d >>" % count]
+    header = b"1 0 2 %d " % (len(stored[0]) + 1)
+    body = stored[0] + b" " + stored[1]
+    packed = zlib.compress(header + body)
+
+    content = b"%PDF-1.5\n"
+    objstm_offset = len(content)
+    content += b"3 0 obj\n<< /Type /ObjStm /N 2 /First %d /Filter /FlateDecode /Length %d >>\nstream\n" % (
+        len(header),
+        len(packed),
+    )
+    content += packed + b"\nendstream\nendobj\n"
+
+    xref_offset = len(content)
+    rows = [(0, 0, 255), (2, 3, 0), (2, 3, 1), (1, objstm_offset, 0), (1, xref_offset, 0)]
+    raw = b"".join(bytes([kind]) + offset.to_bytes(2, "big") + bytes([index]) for kind, offset, index in rows)
+    # PNG-предиктор Up: каждая строка хранит разницу с предыдущей
+    previous = bytes(4)
+    predicted = b""
+    for i in range(0, len(raw), 4):
+        row = raw[i : i + 4]
+        predicted += b"\x02" + bytes((a - b) & 0xFF for a, b in zip(row, previous, strict=True))
+        previous = row
+    xref_data = zlib.compress(predicted)
+    content += (
+        b"4 0 obj\n<< /Type /XRef /Size 5 /W [1 2 1] /Root 1 0 R /Filter /FlateDecode "
+        b"/DecodeParms << /Columns 4 /Predictor 12 >> /Length %d >>\nstream\n" % len(xref_data)
+    )
+    content += xref_data + b"\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n" % xref_offset
+    return content
+
+
+def test_classic_xref(tmp_path):
+    path = tmp_path / "book.pdf"
+    path.write_bytes(
+        build_pdf(
+            {
+                1: b"<< /Type /Catalog /Pages 2 0 R >>",
+                2: b"<< /Type /Pages /Kids [] /Count 3 0 R >>",
+                3: b"42",
+                4: b"<< /Title (War \\(and\\) Peace) /Author <FEFF04220043> >>",
+            },
+            b"<< /Size %d /Root 1 0 R /Info 4 0 R >>",
+        )
+    )
+
+    assert read_pdf_metadata(path) == PdfMetadata(page_count=42, title="War (and) Peace", author="ТC", linearized=False)
+
+
+def test_object_and_xref_streams(tmp_path):
+    path = tmp_path / "compressed.pdf"
+    path.write_bytes(build_pdf_with_object_stream(count=128))
+
+    metadata = read_pdf_metadata(path)
+    assert metadata.page_count == 128
+    assert metadata.title is None
+
+
+def test_falls_back_to_poppler(tmp_path, monkeypatch):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"%PDF-1.4\nnot really a pdf")
+    monkeypatch.setattr(
+        pdf_metadata, "pdfinfo_from_path", lambda _: {"Pages": 5, "Title": "Poppler", "Optimized": "yes"}
+    )
+
+    assert read_pdf_metadata(path) == PdfMetadata(page_count=5, title="Poppler", author=None, linearized=True)
+
+
+def test_cache_tracks_file_changes(tmp_path):
+    path = tmp_path / "book.pdf"
+    path.write_bytes(build_pdf_with_object_stream(count=7))
+    assert read_pdf_metadata(path).page_count == 7
+
+    path.write_bytes(build_pdf_with_object_stream(count=1000))
+    assert read_pdf_metadata(path).page_count == 1000
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from services.reservation import ReservationService
+
+
+@pytest.fixture
+def mock_bot():
+    bot = AsyncMock()
+    bot.send_message = AsyncMock()
+    return bot
+
+
+@pytest.fixture
+def reservations(tmp_path, mock_bot):
+    return ReservationService(bot=mock_bot, reservations_file=tmp_path / "reservations.json", hold_hours=1)
+
+
+def test_reserve_is_fifo_without_duplicates(reservations):
+    assert reservations.reserve(1, "book.pdf") == 1
+    assert reservations.reserve(2, "book.pdf") == 2
+    assert reservations.reserve(1, "book.pdf") is None
+    assert list(reservations.queues["book.pdf"]) == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_release_holds_book_for_next_waiter(reservations, mock_bot):
+    reservations.reserve(1, "book.pdf")
+    reservations.reserve(2, "book.pdf")
+
+    await reservations.release("book.pdf")
+
+    mock_bot.send_message.assert_called_once()
+    assert mock_bot.send_message.call_args.kwargs["chat_id"] == 1
+    assert reservations.is_available_for(1, "book.pdf")
+    assert not reservations.is_available_for(2, "book.pdf")
+
+    reservations.claim(1, "book.pdf")
+    assert reservations.is_available_for(2, "book.pdf")
+
+
+@pytest.mark.asyncio
+async def test_expired_hold_frees_book(reservations):
+    reservations.reserve(1, "book.pdf")
+    await reservations.release("book.pdf")
+    reservations.holds["book.pdf"]["until"] = (datetime.utcnow() - timedelta(minutes=1)).isoformat()
+
+    assert reservations.is_available_for(2, "book.pdf")
+
+
+def test_queues_are_persisted(tmp_path, reservations, mock_bot):
+    reservations.reserve(1, "book.pdf")
+    restored = ReservationService(bot=mock_bot, reservations_file=tmp_path / "reservations.json")
+    assert list(restored.queues["book.pdf"]) == ["1"]
+    assert restored.reserve(1, "book.pdf") is None
+
+
+@pytest.mark.asyncio
+async def test_repeated_release_keeps_first_hold(reservations, mock_bot):
+    reservations.reserve(1, "book.pdf")
+    reservations.reserve(2, "book.pdf")
+
+    await reservations.release("book.pdf")
+    # Книга уже в библиотеке и удерживается — повторный возврат не передаёт бронь дальше
+    await reservations.release("book.pdf")
+
+    mock_bot.send_message.assert_called_once()
+    assert reservations.is_available_for(1, "book.pdf")
+    assert list(reservations.queues["book.pdf"]) == ["2"]
+
+
+@pytest.mark.asyncio
+async def test_expired_hold_is_not_passed_on_while_book_is_on_loan(tmp_path, mock_bot):
+    loans = Mock()
+    loans.is_borrowed.return_value = False
+    reservations = ReservationService(mock_bot, tmp_path / "reservations.json", hold_hours=1, loans=loans)
+    reservations.reserve(1, "book.pdf")
+    reservations.reserve(2, "book.pdf")
+    await reservations.release("book.pdf")
+    mock_bot.send_message.reset_mock()
+
+    # Первый в очереди не успел забрать книгу, и её взял другой читатель
+    reservations.holds["book.pdf"]["until"] = (datetime.utcnow() - timedelta(minutes=1)).isoformat()
+    assert reservations.is_available_for(3, "book.pdf")
+    reservations.claim(3, "book.pdf")
+    loans.is_borrowed.return_value = True
+    await reservations.expire_holds()
+
+    mock_bot.send_message.assert_not_called()
+    assert reservations.holds == {}
+    assert list(reservations.queues["book.pdf"]) == ["2"]
+
+
+@pytest.mark.asyncio
+async def test_expired_hold_of_borrowed_book_is_dropped(tmp_path, mock_bot):
+    loans = Mock()
+    loans.is_borrowed.return_value = True
+    reservations = ReservationService(mock_bot, tmp_path / "reservations.json", hold_hours=1, loans=loans)
+    reservations.reserve(2, "book.pdf")
+    reservations.holds["book.pdf"] = {"user_id": "1", "until": (datetime.utcnow() - timedelta(minutes=1)).isoformat()}
+
+    await reservations.expire_holds()
+
+    mock_bot.send_message.assert_not_called()
+    assert reservations.holds == {}
+    assert list(reservations.queues["book.pdf"]) == ["2"]
@@ -0,0 +1,64 @@
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+
+from services.clock import SimulatedClock
+from services.punishment_system import PunishmentSystemService
+from services.simulation import SIMULATION_START, run_simulation
+
+
+@pytest.fixture
+def service(tmp_path):
+    data_file = tmp_path / "borrowed_books.json"
+    data_file.write_text("{}", encoding="utf-8")
+    bot = AsyncMock()
+    return PunishmentSystemService(
+        bot, data_file, max_borrow_days=14, fine_per_day=10, clock=SimulatedClock(SIMULATION_START)
+    )
+
+
+@pytest.mark.asyncio
+async def test_simulated_clock_wakes_in_order():
+    clock = SimulatedClock(SIMULATION_START)
+    woken = []
+
+    async def sleeper(name, seconds):
+        await clock.sleep(seconds)
+        woken.append((name, clock.now()))
+
+    tasks = [asyncio.create_task(sleeper("late", 120)), asyncio.create_task(sleeper("early", 60))]
+    await clock.advance(timedelta(seconds=90))
+    assert woken == [("early", SIMULATION_START + timedelta(seconds=60))]
+
+    await clock.advance(timedelta(seconds=60))
+    assert [name for name, _ in woken] == ["early", "late"]
+    assert clock.now() == SIMULATION_START + timedelta(seconds=150)
+    for task in tasks:
+        await task
+
+
+@pytest.mark.asyncio
+async def test_fines_accrue_on_simulated_time(service):
+    service.add_borrow(1, "book.pdf")
+    await service.start()
+
+    await service.clock.advance(timedelta(days=20))
+    assert service.get_user_info(1)["fine"] == 6 * 10
+    # Напоминание в день выдачи и по одному в каждый следующий день
+    assert service.bot.send_message.await_count == 21
+
+    service.return_book(1)
+    await service.stop()
+
+
+@pytest.mark.asyncio
+async def test_run_simulation_reports_load():
+    report = await run_simulation(loans=50, days=30, return_rate=0)
+
+    assert report.returned == 0
+    assert report.messages_sent == 50 * 31
+    assert report.store_writes >= report.messages_sent
+    assert report.fines_accrued > 0
+
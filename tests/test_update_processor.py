@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+import pytest
+from telegram import CallbackQuery, Update, User
+
+from infrastructure.update_processor import HEAVY_LANE, INTERACTIVE_LANE, PriorityUpdateProcessor
+
+
+def callback_update(update_id, data):
+    user = User(id=1, first_name="TestUser", is_bot=False)
+    query = CallbackQuery(id=str(update_id), from_user=user, chat_instance="1", data=data)
+    return Update(update_id=update_id, callback_query=query)
+
+
+def test_lanes_by_action():
+    assert PriorityUpdateProcessor.get_lane(callback_update(1, "list_books")) == HEAVY_LANE
+    assert PriorityUpdateProcessor.get_lane(callback_update(2, "get_book:book.pdf")) == HEAVY_LANE
+    assert PriorityUpdateProcessor.get_lane(callback_update(3, "get_my_debt")) == INTERACTIVE_LANE
+
+
+@pytest.mark.asyncio
+async def test_interactive_not_blocked_by_heavy():
+    processor = PriorityUpdateProcessor(interactive_workers=1, heavy_workers=1)
+    heavy_release = asyncio.Event()
+    finished = []
+
+    async def heavy():
+        await heavy_release.wait()
+        finished.append("heavy")
+
+    async def interactive():
+        finished.append("interactive")
+
+    heavy_tasks = [
+        asyncio.create_task(processor.process_update(callback_update(i, "list_books"), heavy())) for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    await processor.process_update(callback_update(10, "get_my_debt"), interactive())
+
+    assert finished == ["interactive"]
+    assert processor.stats[HEAVY_LANE].waiting == 2
+
+    heavy_release.set()
+    await asyncio.gather(*heavy_tasks)
+    assert processor.stats[HEAVY_LANE].processed == 3
+
+
+@pytest.mark.asyncio
+async def test_interactive_runs_while_heavy_renders():
+    processor = PriorityUpdateProcessor(interactive_workers=1, heavy_workers=1)
+    render_may_finish = threading.Event()
+    finished = []
+
+    def render_preview():
+        # Блокирующая работа, как отрисовка превью poppler
+        render_may_finish.wait(timeout=5)
+        finished.append("heavy")
+
+    async def heavy():
+        await asyncio.to_thread(render_preview)
+
+    async def interactive():
+        finished.append("interactive")
+        render_may_finish.set()
+
+    heavy_task = asyncio.create_task(processor.process_update(callback_update(1, "list_books"), heavy()))
+    await asyncio.sleep(0)
+    await asyncio.wait_for(processor.process_update(callback_update(2, "get_my_debt"), interactive()), timeout=1)
+    await heavy_task
+
+    assert finished == ["interactive", "heavy"]
@@ -0,0 +1,47 @@
+from services.update_recorder import sanitize_update
+
+
+def make_update(user_id, text=None, caption=None):
+    message = {
+        "message_id": 7,
+        "date": 0,
+        "from": {"id": user_id, "is_bot": False, "first_name": "Иван", "last_name": "Петров", "username": "ivan"},
+        "chat": {"id": user_id, "type": "private", "first_name": "Иван", "username": "ivan"},
+    }
+    if text is not None:
+        message["text"] = text
+    if caption is not None:
+        message["document"] = {"file_id": "abc", "file_unique_id": "abc", "file_name": "book.pdf"}
+        message["caption"] = caption
+    return {"update_id": 1, "message": message}
+
+
+def test_ids_are_hashed_consistently():
+    first = sanitize_update(make_update(123456, text="/start"), salt="salt")
+    second = sanitize_update(make_update(123456, text="/help"), salt="salt")
+    other = sanitize_update(make_update(654321, text="/start"), salt="salt")
+
+    user_id = first["message"]["from"]["id"]
+    assert user_id != 123456
+    assert user_id == first["message"]["chat"]["id"] == second["message"]["from"]["id"]
+    assert user_id != other["message"]["from"]["id"]
+    assert sanitize_update(make_update(123456), salt="pepper")["message"]["from"]["id"] != user_id
+    # Идентификаторы сообщений и обновлений нужны для воспроизведения и не хешируются
+    assert first["message"]["message_id"] == 7
+    assert first["update_id"] == 1
+
+
+def test_personal_fields_and_free_text_are_stripped():
+    update = sanitize_update(make_update(1, text="мой телефон 555-12-34", caption="верну завтра"), salt="salt")
+    message = update["message"]
+
+    assert message["from"] == {"id": message["from"]["id"], "is_bot": False, "first_name": "user"}
+    assert "username" not in message["chat"]
+    assert message["text"] == ""
+    assert message["caption"] == ""
+    assert message["document"]["file_name"] == "book.pdf"
+
+
+def test_commands_are_kept():
+    update = sanitize_update(make_update(1, text="/overdue_report"), salt="salt")
+    assert update["message"]["text"] == "/overdue_report"